@@ -1,181 +1,699 @@
+"""
+DSS engine: village-level and individual scheme priority scores for FRA claimants.
+
+Claims are read from the database, joined to the nearest waterbody of their
+state, aggregated per village and scored. The result is written to
+``dss_definitive_master_db_new.csv``.
+
+The first run (or ``--full``) computes everything and keeps the joined
+claimants, the village aggregates and a high-water mark under ``--state-dir``.
+Later runs are incremental: only claims with a higher id (or a newer
+``DSS_UPDATED_COLUMN`` timestamp, when the claims table has one) are read and
+spatially joined. Village aggregates are recomputed only for the villages
+those claims (and any deleted claims) belong to. Normalization and the
+individual scores are cheap and are redone over everything, because min-max
+scaling depends on every village.
+
+Usage:
+    python DSS.py            # incremental when state exists, full otherwise
+    python DSS.py --full     # recompute from scratch
+    python DSS.py --workers 8
+    python DSS.py --chunk-size 200000   # out-of-core full run, memory bounded by the chunk
+
+Changed waterbody GeoJSON (see waterbody_cache.py) also forces a full run.
+The nearest-waterbody join runs in DSS_WORKERS processes over tiles of
+DSS_TILE_SIZE claimants; results are reassembled in state and tile order.
+Missing incomes are imputed over every cleaned claim, including claims of
+states without waterbody files, which are then left out of the output.
+Claimant frames use a compact schema (categorical text, float32/int16
+numerics) and each step prints its memory use.
+
+Importable:
+    import DSS
+    final_df = DSS.run(DSS.get_engine(), full=False)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 from sklearn.preprocessing import MinMaxScaler
-from shapely.geometry import Point
-import warnings
-from sqlalchemy import create_engine
-import os
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
+import waterbody_cache
+
 # Load environment variables
 load_dotenv()
 
 # Ignore nuisance warnings for a cleaner output
 warnings.filterwarnings('ignore', 'Geometry is in a geographic CRS')
 
-print("--- Starting the Complete DSS Engine (Hybrid Mode: DB + Local Files) ---")
-
-try:
-    # --- STEP 1: LOAD CLAIMANT DATA FROM DATABASE ---
-    # Get database URL from environment variable
+OUTPUT_CSV = 'dss_definitive_master_db_new.csv'
+STATE_DIR = os.environ.get('DSS_STATE_DIR', '.dss_state')
+UPDATED_COLUMN = os.environ.get('DSS_UPDATED_COLUMN', 'updated_at')  # change-tracking column, if the table has it
+
+# Spatial join: each state's claimants are split into tiles joined in a process pool
+JOIN_WORKERS = int(os.environ.get('DSS_WORKERS', os.cpu_count() or 1))
+JOIN_TILE_SIZE = int(os.environ.get('DSS_TILE_SIZE', 50000))  # claimants per join task
+
+# Out-of-core runs: claims read through a server-side cursor this many at a time (0 = all at once)
+CHUNK_SIZE = int(os.environ.get('DSS_CHUNK_SIZE', 0))
+
+STATE_TO_FILE_MAP = {
+    'Tripura': 'DWA Waterbodies Ph2 for Tripura.geojson',
+    'Madhya Pradesh': 'DWA Waterbodies Ph1 for Madhya Pradesh.geojson',
+    'Odisha': 'DWA Waterbodies Ph1 for Odisha.geojson',
+    'Telangana': 'DWA Waterbodies Ph2 for Telangana.geojson'
+}
+
+CLAIM_SELECT = """
+    id                                  AS "claim_id",
+    claimant_name                       AS "Claimant Name",
+    age                                 AS "Age",
+    gender                              AS "Gender",
+    state                               AS "State",
+    district                            AS "District",
+    block_tehsil                        AS "Block/Tehsil",
+    gram_panchayat                      AS "Gram Panchayat",
+    village                             AS "Village",
+    category                            AS "Category",
+    tax_payer                           AS "Tax Payer",
+    claim_type                          AS "Claim Type",
+    status_of_claim                     AS "Status of Claim",
+    annual_income                       AS "Annual Income",
+    land_use                            AS "Land Use",
+    geo_coordinates                     AS "Geo-Coordinates"
+"""
+
+VILLAGE_KEYS = ['State', 'District', 'Village']
+
+# Waterbody indexes loaded by this process, one per state
+_waterbody_indexes = {}
+
+# Columns kept per claimant between runs
+CLAIMANT_COLUMNS = [
+    'claim_id', 'Claimant Name', 'Age', 'Gender', 'State', 'District', 'Block/Tehsil',
+    'Gram Panchayat', 'Village', 'Category', 'Tax Payer', 'Claim Type',
+    'Status of Claim', 'Annual Income', 'Land Use', 'distance_meters'
+]
+
+# Compact dtypes for the claimant frames: repeated text as categoricals, numerics downcast
+CATEGORICAL_COLUMNS = [
+    'State', 'District', 'Block/Tehsil', 'Gram Panchayat', 'Village', 'Category', 'Gender',
+    'Land Use', 'Claim Type', 'Tax Payer', 'Status of Claim'
+]
+FLOAT32_COLUMNS = ['Annual Income', 'distance_meters']
+
+# Columns kept for every cleaned claim, mapped state or not, for income imputation
+INCOME_COLUMNS = ['claim_id', 'Village', 'Annual Income']
+
+VILLAGE_FEATURES = ['avg_distance_meters', 'percent_agri', 'claimant_count', 'avg_annual_income', 'percent_insecure_tenure']
+
+FINAL_ORDERED_COLS = [
+    'claim_id', 'Claimant Name', 'Age', 'Gender', 'State', 'District', 'Block/Tehsil',
+    'Gram Panchayat', 'Village', 'Category', 'Tax Payer', 'Claim Type',
+    'Status of Claim', 'Annual Income', 'Jal_Jeevan_Mission_Priority',
+    'DAJGUA_Priority', 'MGNREGA_Priority', 'PM_KISAN_Priority', 'PMAY_Priority'
+]
+
+
+def compact(df):
+    """Apply the claimant dtype schema in place and return ``df``"""
+    for column in CATEGORICAL_COLUMNS:
+        if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in FLOAT32_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype(np.float32)
+    if 'claim_id' in df:
+        ids = pd.to_numeric(df['claim_id'])
+        if ids.empty or ids.max() <= np.iinfo(np.int32).max:  # SERIAL ids; BIGSERIAL stays int64
+            df['claim_id'] = ids.astype(np.int32)
+    if 'Age' in df:
+        df['Age'] = pd.to_numeric(df['Age'], errors='coerce').round().astype('Int16')
+    return df
+
+
+def report_memory(**frames):
+    """Print the size of each frame (and per million rows) and the process peak RSS"""
+    parts = []
+    for name, frame in frames.items():
+        megabytes = frame.memory_usage(deep=True).sum() / (1024 * 1024)
+        per_million = f", {megabytes / len(frame) * 1e6:.0f} MB/M rows" if len(frame) else ""
+        parts.append(f"{name} {megabytes:.1f} MB{per_million}")
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        parts.append(f"peak RSS {peak / (1024 * 1024 if sys.platform == 'darwin' else 1024):.0f} MB")
+    print("     memory: " + "; ".join(parts))
+
+
+def get_engine():
+    """SQLAlchemy engine for DATABASE_URL"""
     db_connection_str = os.getenv('DATABASE_URL')
     if not db_connection_str:
         raise ValueError("DATABASE_URL environment variable is not set")
+    return create_engine(db_connection_str)
+
+
+def has_column(db_engine, column):
+    """Whether the claims table has ``column``"""
+    query = text("SELECT 1 FROM information_schema.columns WHERE table_name = 'claims' AND column_name = :column")
+    with db_engine.connect() as conn:
+        return conn.execute(query, {"column": column}).first() is not None
 
-    db_engine = create_engine(db_connection_str)
-    print("✅ 1. Connecting to the database...")
-
-    # Define the corrected SQL query, now including the 'id' column
-    sql_query = """
-    SELECT
-        id                                  AS "claim_id", -- Added claim ID
-        claimant_name                       AS "Claimant Name",
-        age                                 AS "Age",
-        gender                              AS "Gender",
-        state                               AS "State",
-        district                            AS "District",
-        block_tehsil                        AS "Block/Tehsil",
-        gram_panchayat                      AS "Gram Panchayat",
-        village                             AS "Village",
-        category                            AS "Category",
-        tax_payer                           AS "Tax Payer",
-        claim_type                          AS "Claim Type",
-        status_of_claim                     AS "Status of Claim",
-        annual_income                       AS "Annual Income",
-        land_use                            AS "Land Use",
-        geo_coordinates                     AS "Geo-Coordinates"
-    FROM
-        claims;
-    """
 
-    # Fetch the data into a pandas DataFrame
-    df = pd.read_sql(sql_query, db_engine)
+def claims_query(where="", updated_column=None):
+    select = CLAIM_SELECT
+    if updated_column:
+        select += f',\n    {updated_column} AS "updated_at"'
+    return text(f"SELECT {select} FROM claims {where}")
 
-    # Perform data cleaning on the loaded data
-    df[['Latitude', 'Longitude']] = df['Geo-Coordinates'].str.split(', ', expand=True)
-    df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
-    df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
+
+def clean_claims(df):
+    """Parse coordinates and income into compact dtypes; claims without coordinates are dropped"""
+    coordinates = df.pop('Geo-Coordinates').str.split(', ', n=1, expand=True).reindex(columns=[0, 1])
+    df['Latitude'] = pd.to_numeric(coordinates[0], errors='coerce')
+    df['Longitude'] = pd.to_numeric(coordinates[1], errors='coerce')
+    del coordinates
     df['Annual Income'] = pd.to_numeric(df['Annual Income'], errors='coerce')
-    df.dropna(subset=['Latitude', 'Longitude'], inplace=True)
-
-    # Impute missing Annual Income values
-    village_median_income = df.groupby('Village')['Annual Income'].transform('median')
-    df['Annual Income'].fillna(village_median_income, inplace=True)
-    global_median_income = df['Annual Income'].median()
-    df['Annual Income'].fillna(global_median_income, inplace=True)
-    print("✅ 1. Claimant data (including ID) loaded and cleaned from database.")
-
-
-    # --- STEP 2: LOAD WATERBODY DATA FROM LOCAL FILES & PROCESS ---
-    state_to_file_map = {
-        'Tripura': 'DWA Waterbodies Ph2 for Tripura.geojson',
-        'Madhya Pradesh': 'DWA Waterbodies Ph1 for Madhya Pradesh.geojson',
-        'Odisha': 'DWA Waterbodies Ph1 for Odisha.geojson',
-        'Telangana': 'DWA Waterbodies Ph2 for Telangana.geojson'
-    }
+    df = df[df['Latitude'].notna() & df['Longitude'].notna()]
+    return compact(df.reset_index(drop=True))
 
-    processed_states = []
 
-    print("✅ 2. Starting geospatial processing using local GeoJSON files...")
-    for state_name, geojson_file in state_to_file_map.items():
-        print(f"  -> Processing {state_name}...")
+def load_claims(db_engine, where="", params=None, updated_column=None):
+    """Read claims (optionally filtered); returns the cleaned frame and the ids of every row read
+
+    The ids include claims that cleaning dropped, so an incremental run can
+    retire the previous version of a claim whose coordinates became invalid.
+    """
+    raw = pd.read_sql(claims_query(where, updated_column), db_engine, params=params or {})
+    ids = raw['claim_id'].copy()
+    return clean_claims(raw), ids
+
+
+def stream_claims(db_engine, chunk_size):
+    """Yield cleaned claims in id order, ``chunk_size`` rows at a time, through a server-side cursor"""
+    with db_engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+        for chunk in pd.read_sql(claims_query("ORDER BY id"), conn, chunksize=chunk_size):
+            yield clean_claims(chunk)
 
-        state_claimants_df = df[df['State'] == state_name].copy()
-        if state_claimants_df.empty:
-            continue
 
-        waterbodies_gdf = gpd.read_file(geojson_file)
+def nearest_distances(task):
+    """Worker: distance to the nearest waterbody for one tile of a state's claimants"""
+    state_name, longitude, latitude = task
+    waterbodies_index = _waterbody_indexes.get(state_name)
+    if waterbodies_index is None:
+        waterbodies_index = _waterbody_indexes[state_name] = waterbody_cache.load_index(
+            state_name, STATE_TO_FILE_MAP[state_name])
 
-        claimants_gdf = gpd.GeoDataFrame(
-            state_claimants_df,
-            geometry=gpd.points_from_xy(state_claimants_df.Longitude, state_claimants_df.Latitude),
-            crs="EPSG:4326"
-        )
+    claimants_proj = gpd.GeoSeries(gpd.points_from_xy(longitude, latitude), crs="EPSG:4326").to_crs("EPSG:7755")
+
+    # One nearest waterbody per claimant; equidistant ties do not duplicate the claimant
+    (point_index, _), distances = waterbodies_index.query_nearest(
+        np.asarray(claimants_proj.values), return_distance=True, all_matches=False
+    )
+    distance_meters = np.full(len(longitude), np.nan)
+    distance_meters[point_index] = distances
+    return distance_meters
 
-        claimants_proj = claimants_gdf.to_crs("EPSG:7755")
-        waterbodies_proj = waterbodies_gdf.to_crs("EPSG:7755")
 
-        merged_state_gdf = gpd.sjoin_nearest(
-            claimants_proj,
-            waterbodies_proj,
-            how="left",
-            distance_col="distance_meters"
-        )
+def join_waterbodies(df, workers=JOIN_WORKERS, tile_size=JOIN_TILE_SIZE, pool=None):
+    """Distance from every claimant to the nearest waterbody of their state (EPSG:7755, metres)
 
-        processed_states.append(merged_state_gdf)
+    ``pool`` is an existing multiprocessing pool to run the tiles in, reused
+    across calls by a streaming run.
+    """
+    states = df['State'].to_numpy()
+    longitude, latitude = df['Longitude'].to_numpy(), df['Latitude'].to_numpy()
+    tiles = []  # (state, row positions in df)
+    for state_name, geojson_file in STATE_TO_FILE_MAP.items():
+        positions = np.flatnonzero(states == state_name)
+        if not len(positions):
+            continue
+        print(f"  -> Processing {state_name} ({len(positions)} claimants)...")
+        if waterbody_cache.HAS_PYARROW:
+            waterbody_cache.ensure(state_name, geojson_file)  # build once, before any worker reads it
+        for offset in range(0, len(positions), tile_size):
+            tiles.append((state_name, positions[offset:offset + tile_size]))
+
+    tasks = [(state_name, longitude[positions], latitude[positions]) for state_name, positions in tiles]
+    if pool is not None:
+        distances = pool.map(nearest_distances, tasks)
+    elif workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            distances = pool.map(nearest_distances, tasks)  # results come back in task order
+    else:
+        distances = [nearest_distances(task) for task in tasks]
+
+    # One gather of the kept rows (claimants of other states are dropped), in state and tile order
+    order = np.concatenate([positions for _, positions in tiles]) if tiles else np.array([], dtype=int)
+    columns = [df.columns.get_loc(column) for column in CLAIMANT_COLUMNS if column != 'distance_meters']
+    joined = df.iloc[order, columns].reset_index(drop=True)
+    joined['distance_meters'] = np.concatenate(distances).astype(np.float32) if tiles else np.array([], np.float32)
+    return joined
+
+
+def waterbody_checksums():
+    """Source checksum of every state's waterbodies; a change forces a full run"""
+    return {
+        state_name: waterbody_cache.checksum(state_name, geojson_file)
+        for state_name, geojson_file in STATE_TO_FILE_MAP.items()
+        if os.path.exists(geojson_file) or os.path.exists(waterbody_cache.cache_path(state_name))
+    }
 
-    accurate_df = pd.concat(processed_states, ignore_index=True)
-    print("✅ 2. Geospatial processing complete. Distances are accurate.")
 
-    # --- STEPS 3 and 4 remain IDENTICAL ---
-    # --- STEP 3: CALCULATE ALL VILLAGE-LEVEL PRIORITY INDICES ---
-    print("✅ 3. Calculating village-level priority indices...")
-    accurate_df['distance_meters'].fillna(accurate_df['distance_meters'].max(), inplace=True)
+def prepare_claimants(claimants, fills=None):
+    """Fill missing distances with the largest one and impute missing incomes (village, then global median)
 
-    village_stats = accurate_df.groupby(['State', 'District', 'Village']).agg(
+    ``fills`` is ``(max distance, median income by village name, global
+    median)``, from ``income_fills`` or ``VillageAccumulator.finalize``, when
+    the medians should come from more claims than ``claimants`` holds.
+    """
+    prepared = claimants.copy(deep=False)  # only the two filled columns below are new
+    if fills is None:
+        max_distance = prepared['distance_meters'].max()
+        village_median_income = prepared.groupby('Village', observed=True)['Annual Income'].transform('median')
+    else:
+        max_distance, village_medians, global_median = fills
+        village_median_income = prepared['Village'].astype(object).map(village_medians)
+    prepared['distance_meters'] = prepared['distance_meters'].fillna(max_distance)
+    prepared['Annual Income'] = prepared['Annual Income'].fillna(village_median_income)
+    if fills is None:
+        global_median = prepared['Annual Income'].median()
+    prepared['Annual Income'] = prepared['Annual Income'].fillna(global_median)
+    return prepared
+
+
+def income_fills(claims):
+    """Median income by village name, and the global median after village imputation
+
+    Computed over every cleaned claim, before the waterbody join drops claims
+    of states without waterbody files, as the original engine did.
+    """
+    village_medians = claims.groupby('Village', observed=True)['Annual Income'].median()
+    village_medians.index = village_medians.index.astype(object)
+    incomes = claims['Annual Income'].fillna(claims['Village'].astype(object).map(village_medians))
+    return village_medians, incomes.median()
+
+
+def global_fill_villages(claimants):
+    """Villages whose aggregates depend on global fill values (a missing distance, or no known income)"""
+    flags = pd.DataFrame({
+        'missing_distance': claimants['distance_meters'].isna(),
+        'known_income': claimants['Annual Income'].notna(),
+    })
+    for key in VILLAGE_KEYS:
+        flags[key] = claimants[key]
+    grouped = flags.groupby(VILLAGE_KEYS, observed=True).agg(missing_distance=('missing_distance', 'any'),
+                                              known_income=('known_income', 'any'))
+    return grouped.index[grouped['missing_distance'] | ~grouped['known_income']]
+
+
+def village_aggregates(prepared):
+    """Raw village features from prepared claimants"""
+    features = pd.DataFrame({
+        'name': prepared['Claimant Name'],
+        'distance_meters': prepared['distance_meters'],
+        'agri': (prepared['Land Use'] == 'Agriculture') * 100.0,
+        'income': prepared['Annual Income'],
+        'insecure': (prepared['Status of Claim'] != 'Approved') * 100.0,
+    })
+    for key in VILLAGE_KEYS:
+        features[key] = prepared[key]
+    return features.groupby(VILLAGE_KEYS, observed=True).agg(
         avg_distance_meters=('distance_meters', 'mean'),
-        claimant_count=('Claimant Name', 'count'),
-        percent_agri=('Land Use', lambda x: (x == 'Agriculture').sum() / len(x) * 100),
-        avg_annual_income=('Annual Income', 'mean'),
-        percent_insecure_tenure=('Status of Claim', lambda x: (x != 'Approved').sum() / len(x) * 100)
+        claimant_count=('name', 'count'),
+        percent_agri=('agri', 'mean'),
+        avg_annual_income=('income', 'mean'),
+        percent_insecure_tenure=('insecure', 'mean')
     ).reset_index()
 
+
+class VillageAccumulator:
+    """Village aggregates merged chunk by chunk, for streaming runs
+
+    Counts and sums per village are added up as chunks arrive. Incomes of
+    every cleaned claim (see ``income_fills``) are kept as one (village code,
+    income) pair of arrays per chunk, plus the village codes of claims without
+    one, because the imputation uses exact village medians; that is the only
+    state that grows with the table (12 bytes per claimant with an income, 4
+    per claimant without).
+    """
+
+    def __init__(self):
+        self.partials = []
+        self.village_codes = {}  # village name -> code used in income_villages and missing_villages
+        self.income_villages = []
+        self.incomes = []
+        self.missing_villages = []
+        self.max_distance = np.nan
+
+    def add(self, joined, claims):
+        """Add one chunk: ``claims`` as cleaned, ``joined`` as ``join_waterbodies`` returned it"""
+        known = joined['Annual Income'].notna()
+        partial = pd.DataFrame({
+            'rows': 1,
+            'names': joined['Claimant Name'].notna(),
+            'distance_sum': joined['distance_meters'].fillna(0),
+            'distance_missing': joined['distance_meters'].isna(),
+            'agri': joined['Land Use'] == 'Agriculture',
+            'insecure': joined['Status of Claim'] != 'Approved',
+            'income_sum': joined['Annual Income'].fillna(0),
+            'income_known': known,
+        }, index=joined.index)
+        for key in VILLAGE_KEYS:
+            partial[key] = joined[key]
+        self.partials.append(partial.groupby(VILLAGE_KEYS, observed=True).sum())
+        if len(self.partials) >= 32:
+            self.partials = [pd.concat(self.partials).groupby(level=VILLAGE_KEYS, observed=True).sum()]
+
+        villages = claims['Village'].astype('category')
+        codes = np.array([self.village_codes.setdefault(name, len(self.village_codes))
+                          for name in villages.cat.categories] + [-1], dtype=np.int32)
+        codes = codes[villages.cat.codes.to_numpy()]  # a missing village (category code -1) maps to -1
+        incomes = claims['Annual Income'].to_numpy(np.float64)
+        known = ~np.isnan(incomes)
+        self.income_villages.append(codes[known])
+        self.incomes.append(incomes[known])
+        self.missing_villages.append(codes[~known])
+        self.max_distance = pd.Series([self.max_distance, joined['distance_meters'].max()]).max()
+
+    def finalize(self):
+        """Village features as ``village_aggregates`` returns them, and the fills for ``prepare_claimants``"""
+        totals = pd.concat(self.partials).groupby(level=VILLAGE_KEYS, observed=True).sum()
+        incomes = np.concatenate(self.incomes) if self.incomes else np.empty(0)
+        codes = np.concatenate(self.income_villages) if self.income_villages else np.empty(0, np.int32)
+        missing = np.concatenate(self.missing_villages) if self.missing_villages else np.empty(0, np.int32)
+        named = codes >= 0
+        village_medians = pd.Series(incomes[named]).groupby(codes[named]).median()
+
+        # Global median of incomes after village imputation, as income_fills computes it
+        fills = village_medians.reindex(missing).to_numpy(float)
+        imputed = np.concatenate([incomes, fills[~np.isnan(fills)]])
+        global_median = np.median(imputed) if len(imputed) else np.nan
+        village_medians.index = np.array(list(self.village_codes), dtype=object)[village_medians.index]
+
+        income_fill = pd.Series(totals.index.get_level_values('Village').astype(object).map(village_medians),
+                                index=totals.index, dtype=float).fillna(global_median)
+        rows = totals['rows']
+        villages = pd.DataFrame({
+            'avg_distance_meters': (totals['distance_sum'] + totals['distance_missing'] * self.max_distance) / rows,
+            'claimant_count': totals['names'],
+            'percent_agri': totals['agri'] / rows * 100,
+            'avg_annual_income': (totals['income_sum'] + (rows - totals['income_known']) * income_fill) / rows,
+            'percent_insecure_tenure': totals['insecure'] / rows * 100,
+        }).reset_index()
+        return villages, (self.max_distance, village_medians, global_median)
+
+
+def score_villages(village_stats):
+    """Normalize village features and compute the village-level scheme priorities"""
+    village_stats = village_stats.copy()
     scaler = MinMaxScaler()
     village_stats[['dist_norm', 'agri_norm', 'count_norm', 'income_norm', 'tenure_norm']] = scaler.fit_transform(
-        village_stats[['avg_distance_meters', 'percent_agri', 'claimant_count', 'avg_annual_income', 'percent_insecure_tenure']]
+        village_stats[VILLAGE_FEATURES]
     )
     village_stats['income_need_score'] = 1 - village_stats['income_norm']
 
     village_stats['Jal_Jeevan_Mission_Priority'] = ((village_stats['dist_norm'] * 0.5) + (village_stats['count_norm'] * 0.3) + (village_stats['agri_norm'] * 0.2))
     village_stats['DAJGUA_Priority'] = ((village_stats['income_need_score'] * 0.5) + (village_stats['tenure_norm'] * 0.5))
     village_stats['MGNREGA_Priority'] = ((village_stats['income_need_score'] * 0.6) + (village_stats['agri_norm'] * 0.4))
+    return village_stats
+
+
+def eligibility(claimants):
+    """Claimants eligible for each individual-level scheme"""
+    return {
+        'PMAY_Priority': (claimants['Category'] == 'ST') & (claimants['Annual Income'] < 250000),
+        'PM_KISAN_Priority': (claimants['Land Use'] == 'Agriculture') & (claimants['Tax Payer'] == 'No'),
+    }
 
-    # --- STEP 4: CALCULATE INDIVIDUAL-LEVEL PRIORITY SCORES ---
-    print("✅ 4. Calculating individual-level priority scores...")
 
-    final_df = pd.merge(accurate_df, village_stats, on=['State', 'District', 'Village'], how='left')
+def income_ranges(prepared, ranges=None):
+    """Min/max income of each scheme's eligible claimants, merged with ``ranges`` from earlier chunks"""
+    ranges = dict(ranges or {})
+    for column, mask in eligibility(prepared).items():
+        incomes = prepared.loc[mask, 'Annual Income']
+        if incomes.empty:
+            continue
+        low, high = incomes.min(), incomes.max()
+        if column in ranges:
+            low, high = min(low, ranges[column][0]), max(high, ranges[column][1])
+        ranges[column] = (low, high)
+    return ranges
 
-    final_df['PMAY_Priority'] = 0.0
-    final_df['PM_KISAN_Priority'] = 0.0
 
-    pmay_eligible_mask = (final_df['Category'] == 'ST') & (final_df['Annual Income'] < 250000)
-    if pmay_eligible_mask.sum() > 0:
-        pmay_incomes = final_df.loc[pmay_eligible_mask, ['Annual Income']]
-        final_df.loc[pmay_eligible_mask, 'PMAY_Priority'] = 1 - scaler.fit_transform(pmay_incomes)
+def score_claimants(prepared, village_stats, ranges=None):
+    """Individual-level priorities plus the village priorities of each claimant
 
-    pmkisan_eligible_mask = (final_df['Land Use'] == 'Agriculture') & (final_df['Tax Payer'] == 'No')
-    if pmkisan_eligible_mask.sum() > 0:
-        pmkisan_incomes = final_df.loc[pmkisan_eligible_mask, ['Annual Income']]
-        final_df.loc[pmkisan_eligible_mask, 'PM_KISAN_Priority'] = 1 - scaler.fit_transform(pmkisan_incomes)
+    Individual priorities are min-max scaled incomes of the eligible
+    claimants; pass the ``ranges`` of the whole table when ``prepared`` is
+    one chunk of it.
+    """
+    if ranges is None:
+        ranges = income_ranges(prepared)
+    scores = {}
+    for column, eligible_mask in eligibility(prepared).items():
+        scores[column] = np.zeros(len(prepared), dtype=np.float32)
+        if eligible_mask.sum() > 0:
+            # Same as MinMaxScaler: a constant range scales to 0
+            low, high = ranges[column]
+            incomes = prepared.loc[eligible_mask, 'Annual Income'].to_numpy(np.float64)
+            scores[column][eligible_mask.to_numpy()] = 1 - (incomes - low) / ((high - low) or 1)
+
+    # Sort by claim_id to maintain database order; the output columns are gathered once
+    order = np.argsort(prepared['claim_id'].to_numpy(), kind='stable')
+    columns = [prepared.columns.get_loc(column) for column in FINAL_ORDERED_COLS if column in prepared]
+    final_df = prepared.iloc[order, columns].reset_index(drop=True)
+
+    # Village priorities are looked up per claimant instead of merging the frames
+    village_rows = pd.MultiIndex.from_frame(village_stats[VILLAGE_KEYS]).get_indexer(
+        pd.MultiIndex.from_frame(final_df[VILLAGE_KEYS]))
+    for column in ['Jal_Jeevan_Mission_Priority', 'DAJGUA_Priority', 'MGNREGA_Priority']:
+        values = np.append(village_stats[column].to_numpy(np.float32), np.float32(np.nan))
+        final_df[column] = values[village_rows].clip(0, 1)  # -1 (no village) picks the trailing NaN
+    for column in ['PM_KISAN_Priority', 'PMAY_Priority']:
+        final_df[column] = scores[column][order].clip(0, 1)
+    return final_df
+
+
+def load_state(state_dir):
+    """Claimants, village aggregates, high-water mark and claim incomes of the last run, or None"""
+    try:
+        with open(os.path.join(state_dir, 'state.json'), 'r') as f:
+            mark = json.load(f)
+        claimants = pd.read_pickle(os.path.join(state_dir, 'claimants.pkl'))
+        villages = pd.read_pickle(os.path.join(state_dir, 'villages.pkl'))
+        incomes = pd.read_pickle(os.path.join(state_dir, 'incomes.pkl'))
+    except (OSError, ValueError):
+        return None
+    return claimants, villages, mark, incomes
+
+
+def save_state(state_dir, claimants, villages, mark, incomes):
+    """Persist the run's state; each file is replaced atomically"""
+    os.makedirs(state_dir, exist_ok=True)
+    for name, frame in (('claimants.pkl', claimants), ('villages.pkl', villages), ('incomes.pkl', incomes)):
+        path = os.path.join(state_dir, name)
+        frame.to_pickle(path + '.tmp')
+        os.replace(path + '.tmp', path)
+    path = os.path.join(state_dir, 'state.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(mark, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def high_water_mark(claims, updated_column, waterbodies, previous=None):
+    """Largest claim id and change timestamp seen so far"""
+    mark = dict(previous or {"max_id": 0, "max_updated": None})
+    mark["updated_column"] = updated_column
+    mark["waterbodies"] = waterbodies
+    if not claims.empty:
+        mark["max_id"] = max(mark["max_id"], int(claims['claim_id'].max()))
+        if updated_column and claims['updated_at'].notna().any():
+            latest = pd.Timestamp(claims['updated_at'].max()).isoformat()
+            mark["max_updated"] = max(filter(None, [mark["max_updated"], latest]))
+    return mark
+
+
+def run(db_engine, full=False, state_dir=STATE_DIR, output=OUTPUT_CSV, workers=JOIN_WORKERS):
+    """Run the engine (incrementally when saved state allows) and write the master CSV"""
+    updated_column = UPDATED_COLUMN if UPDATED_COLUMN and has_column(db_engine, UPDATED_COLUMN) else None
+    waterbodies = waterbody_checksums()
+    state = None if full else load_state(state_dir)
+    if state is not None and state[2].get("updated_column") != updated_column:
+        state = None  # change tracking differs from the saved run
+    if state is not None and state[2].get("waterbodies") != waterbodies:
+        print("✅ Waterbody files changed since the last run; recomputing all distances.")
+        state = None
+
+    if state is None:
+        print("✅ 1. Loading all claims (full run)...")
+        claims, _ = load_claims(db_engine, updated_column=updated_column)
+        mark = high_water_mark(claims, updated_column, waterbodies)
+        print(f"✅ 1. {len(claims)} claims loaded and cleaned from database.")
+        report_memory(claims=claims)
+        incomes = claims[INCOME_COLUMNS].copy()
+        village_medians, global_median = income_fills(claims)
+
+        print("✅ 2. Starting geospatial processing using local GeoJSON files...")
+        claimants = join_waterbodies(claims, workers)
+        del claims
+        prepared = prepare_claimants(claimants, (claimants['distance_meters'].max(), village_medians, global_median))
+        report_memory(claimants=claimants)
+
+        print("✅ 3. Calculating village-level priority indices...")
+        villages = village_aggregates(prepared)
+    else:
+        claimants, villages, mark, incomes = state
+        params = {"max_id": mark["max_id"]}
+        where = 'WHERE id > :max_id'
+        if updated_column and mark["max_updated"]:
+            params["max_updated"] = mark["max_updated"]
+            where += f' OR {updated_column} >= :max_updated'
+        print(f"✅ 1. Loading claims changed since claim {mark['max_id']} / {mark['max_updated']}...")
+        claims, changed_ids = load_claims(db_engine, where, params, updated_column)
+        mark = high_water_mark(claims, updated_column, waterbodies, mark)
+        current_ids = pd.read_sql(text('SELECT id AS "claim_id" FROM claims'), db_engine)['claim_id']
+        print(f"✅ 1. {len(claims)} new or changed claims loaded from database.")
+
+        print("✅ 2. Joining changed claimants to waterbodies...")
+        joined = join_waterbodies(claims, workers)
+
+        # Claims that changed, moved state or were deleted drop out; the new versions replace them
+        stale = claimants['claim_id'].isin(changed_ids) | ~claimants['claim_id'].isin(current_ids)
+        stale_incomes = incomes['claim_id'].isin(changed_ids) | ~incomes['claim_id'].isin(current_ids)
+        touched = pd.concat([claimants.loc[stale, VILLAGE_KEYS], joined[VILLAGE_KEYS]])
+        touched_names = pd.concat([incomes.loc[stale_incomes, 'Village'].astype(object),
+                                   claims['Village'].astype(object)])
+        claimants = compact(pd.concat([claimants[~stale], joined], ignore_index=True))
+        incomes = compact(pd.concat([incomes[~stale_incomes], claims[INCOME_COLUMNS]], ignore_index=True))
+        del claims, joined
+        village_medians, global_median = income_fills(incomes)
+        prepared = prepare_claimants(claimants, (claimants['distance_meters'].max(), village_medians, global_median))
+        report_memory(claimants=claimants)
+
+        # Incomes are imputed by village name (over claims of every state), so every
+        # village sharing a touched name is recomputed
+        same_name = prepared.loc[prepared['Village'].isin(touched_names), VILLAGE_KEYS]
+        affected = (pd.MultiIndex.from_frame(touched.drop_duplicates())
+                    .union(pd.MultiIndex.from_frame(same_name.drop_duplicates()))
+                    .union(global_fill_villages(claimants)))
+        print(f"✅ 3. Recomputing aggregates for {len(affected)} affected villages...")
+        in_affected = pd.MultiIndex.from_frame(prepared[VILLAGE_KEYS]).isin(affected)
+        keep = ~pd.MultiIndex.from_frame(villages[VILLAGE_KEYS]).isin(affected)
+        villages = pd.concat([villages[keep], village_aggregates(prepared[in_affected])], ignore_index=True)
+
+    village_stats = score_villages(villages)
+    report_memory(villages=village_stats)
 
-    priority_cols = ['Jal_Jeevan_Mission_Priority', 'DAJGUA_Priority', 'MGNREGA_Priority', 'PM_KISAN_Priority', 'PMAY_Priority']
-    for col in priority_cols:
-        final_df[col] = final_df[col].clip(0, 1)
+    print("✅ 4. Calculating individual-level priority scores...")
+    final_df = score_claimants(prepared, village_stats)
+    del prepared
+    report_memory(final=final_df)
 
-    # --- STEP 5: ASSEMBLE, SORT, AND SAVE THE FINAL FILE ---
     print("✅ 5. Assembling the definitive master file...")
-    
-    # Sort the final dataframe by the claim_id to maintain database order
-    final_df.sort_values(by='claim_id', inplace=True)
+    final_df.to_csv(output, index=False)
+    save_state(state_dir, claimants, villages, mark, incomes)
+    return final_df
 
-    # Define the final column order, with claim_id at the front
-    final_ordered_cols = [
-        'claim_id', 'Claimant Name', 'Age', 'Gender', 'State', 'District', 'Block/Tehsil',
-        'Gram Panchayat', 'Village', 'Category', 'Tax Payer', 'Claim Type',
-        'Status of Claim', 'Annual Income', 'Jal_Jeevan_Mission_Priority',
-        'DAJGUA_Priority', 'MGNREGA_Priority', 'PM_KISAN_Priority', 'PMAY_Priority'
-    ]
-    final_df = final_df[final_ordered_cols]
 
-    final_df.to_csv('dss_definitive_master_db_new.csv', index=False)
+def run_streaming(db_engine, chunk_size, output=OUTPUT_CSV, workers=JOIN_WORKERS):
+    """Full run that never holds the claims table in memory; returns the number of claims read
 
-    print("\n✅✅✅ DSS ENGINE COMPLETE! ✅✅✅")
-    print("      -> A single, definitive file has been saved as 'dss_definitive_master.csv'")
+    Claims arrive in id order, ``chunk_size`` at a time. Each chunk is joined to
+    the waterbodies, added to the village aggregates and spilled to a temporary
+    file. Once the aggregates are final, the spilled chunks are read back
+    twice, first for the individual income ranges and then to be scored and
+    appended to the CSV.
+    """
+    accumulator = VillageAccumulator()
+    claims_read = 0
+    with tempfile.TemporaryDirectory(prefix='dss_chunks_') as spill_dir:
+        spills = []
+        print(f"✅ 1-2. Streaming claims in chunks of {chunk_size} and joining them to waterbodies...")
+        pool = multiprocessing.Pool(workers) if workers > 1 else None
+        try:
+            for claims in stream_claims(db_engine, chunk_size):
+                joined = join_waterbodies(claims, workers, min(JOIN_TILE_SIZE, max(1000, chunk_size // workers)), pool)
+                accumulator.add(joined, claims)
+                path = os.path.join(spill_dir, f"chunk_{len(spills):06d}.pkl")
+                joined.to_pickle(path)
+                spills.append(path)
+                claims_read += len(claims)
+                print(f"  -> {claims_read} claims streamed")
+                report_memory(chunk=joined)
+                del claims, joined
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        print("✅ 3. Calculating village-level priority indices...")
+        villages, fills = accumulator.finalize()
+        village_stats = score_villages(villages)
+        report_memory(villages=village_stats)
+
+        print("✅ 4. Calculating individual-level priority scores...")
+        ranges = {}
+        for path in spills:
+            ranges = income_ranges(prepare_claimants(pd.read_pickle(path), fills), ranges)
+
+        print("✅ 5. Assembling the definitive master file...")
+        for index, path in enumerate(spills):
+            scored = score_claimants(prepare_claimants(pd.read_pickle(path), fills), village_stats, ranges)
+            scored.to_csv(output + '.tmp', mode='a' if index else 'w', header=not index, index=False)
+        os.replace(output + '.tmp', output)
+    return claims_read
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--full', action='store_true', help='Recompute everything instead of only changed claims')
+    parser.add_argument('--state-dir', default=STATE_DIR, help='Where joined claimants and the high-water mark are kept')
+    parser.add_argument('--output', default=OUTPUT_CSV)
+    parser.add_argument('--workers', type=int, default=JOIN_WORKERS, help='Processes for the spatial join')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='Stream claims this many at a time (a full, out-of-core run); 0 loads them at once')
+    args = parser.parse_args(argv)
+
+    print("--- Starting the Complete DSS Engine (Hybrid Mode: DB + Local Files) ---")
+    start = time.perf_counter()
+    try:
+        if args.chunk_size:
+            run_streaming(get_engine(), args.chunk_size, output=args.output, workers=args.workers)
+            final_df = pd.read_csv(args.output, nrows=5)
+        else:
+            final_df = run(get_engine(), full=args.full, state_dir=args.state_dir, output=args.output,
+                           workers=args.workers)
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: A required local file was not found. Please ensure all .geojson files are present. Missing file: {e.filename}")
+        return 1
+    except Exception as e:
+        print(f"An unexpected error occurred while connecting to the database or processing data: {e}")
+        return 1
+
+    print(f"\n✅✅✅ DSS ENGINE COMPLETE in {time.perf_counter() - start:.1f}s! ✅✅✅")
+    print(f"      -> A single, definitive file has been saved as '{args.output}'")
 
     print("\n--- Preview of the Final DSS Database ---")
     print(final_df.head())
+    return 0
+
 
-except FileNotFoundError as e:
-    print(f"❌ ERROR: A required local file was not found. Please ensure all .geojson files are present. Missing file: {e.filename}")
-except Exception as e:
-    print(f"An unexpected error occurred while connecting to the database or processing data: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
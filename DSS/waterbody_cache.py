@@ -0,0 +1,153 @@
+"""
+Pre-projected waterbody cache for the DSS engine.
+
+Reading a state's waterbody GeoJSON and projecting every polygon to
+EPSG:7755 takes seconds per run. This module does it once per source file
+and writes the projected geometries (WKB) to an uncompressed Arrow IPC file,
+``<cache dir>/<state>.arrow``. Loading memory-maps that file, so the only
+per-run work is decoding WKB and bulk-loading the STR-tree nearest-neighbour
+index.
+
+Each cache file records the size, mtime and SHA-256 of its GeoJSON source.
+A cache whose source has a different checksum is rebuilt. A cache whose
+source is missing is still used, so deployments can ship the cache files
+alone.
+
+pyarrow is optional; without it the GeoJSON is read and projected every run
+as before.
+
+Usage:
+    python waterbody_cache.py            # build or refresh every state's cache
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+import geopandas as gpd
+import shapely
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = os.environ.get('DSS_WATERBODY_CACHE', '.waterbody_cache')
+TARGET_CRS = "EPSG:7755"
+METADATA_KEY = b'dss_waterbody_source'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_info(geojson_file, sha256=None):
+    """Identity of a GeoJSON source as stored in its cache file"""
+    stat = os.stat(geojson_file)
+    return {
+        "file": os.path.basename(geojson_file),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256 or file_sha256(geojson_file),
+        "crs": TARGET_CRS,
+    }
+
+
+def cache_path(state_name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, state_name.replace(' ', '_') + '.arrow')
+
+
+def read_table(path):
+    """Memory-map a cache file; returns the Arrow table and its source info"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table, json.loads(table.schema.metadata[METADATA_KEY])
+
+
+def write_table(path, geometries_wkb, info):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table = pa.table({'geometry': pa.array(geometries_wkb, type=pa.binary())})
+    table = table.replace_schema_metadata({METADATA_KEY: json.dumps(info)})
+    with pa.OSFile(path + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(path + '.tmp', path)
+
+
+def build(state_name, geojson_file, cache_dir=CACHE_DIR):
+    """Read, project and cache one state's waterbodies; returns the cache path"""
+    sha256 = file_sha256(geojson_file)
+    waterbodies = gpd.read_file(geojson_file).to_crs(TARGET_CRS)
+    geometries = waterbodies.geometry.values
+    geometries = geometries[~(geometries.isna() | geometries.is_empty)]
+    path = cache_path(state_name, cache_dir)
+    write_table(path, shapely.to_wkb(geometries), source_info(geojson_file, sha256))
+    return path
+
+
+def ensure(state_name, geojson_file, cache_dir=CACHE_DIR):
+    """Path of an up-to-date cache for ``geojson_file``, (re)building it if needed"""
+    path = cache_path(state_name, cache_dir)
+    if not os.path.exists(path):
+        return build(state_name, geojson_file, cache_dir)
+    if not os.path.exists(geojson_file):
+        return path  # shipped without its source
+
+    table, info = read_table(path)
+    stat = os.stat(geojson_file)
+    if (info.get("size"), info.get("mtime_ns"), info.get("crs")) == (stat.st_size, stat.st_mtime_ns, TARGET_CRS):
+        return path
+    sha256 = file_sha256(geojson_file)
+    if info.get("sha256") != sha256 or info.get("crs") != TARGET_CRS:
+        return build(state_name, geojson_file, cache_dir)
+    # Touched but unchanged: record the new mtime so the checksum is skipped next time
+    write_table(path, table.column('geometry'), source_info(geojson_file, sha256))
+    return path
+
+
+def checksum(state_name, geojson_file, cache_dir=CACHE_DIR):
+    """SHA-256 of the waterbody source the cache was built from"""
+    if not HAS_PYARROW:
+        return file_sha256(geojson_file)
+    return read_table(ensure(state_name, geojson_file, cache_dir))[1]["sha256"]
+
+
+def load_index(state_name, geojson_file, cache_dir=CACHE_DIR):
+    """STR-tree over a state's waterbodies in EPSG:7755"""
+    if not HAS_PYARROW:
+        geometries = gpd.read_file(geojson_file).to_crs(TARGET_CRS).geometry.values
+        return shapely.STRtree(geometries[~(geometries.isna() | geometries.is_empty)])
+    table, _ = read_table(ensure(state_name, geojson_file, cache_dir))
+    return shapely.STRtree(shapely.from_wkb(table.column('geometry').to_numpy(zero_copy_only=False)))
+
+
+def main():
+    from DSS import STATE_TO_FILE_MAP
+
+    if not HAS_PYARROW:
+        print("❌ pyarrow is not installed; the DSS engine will read GeoJSON directly.")
+        return 1
+    for state_name, geojson_file in STATE_TO_FILE_MAP.items():
+        if not os.path.exists(geojson_file):
+            print(f"  -> {state_name}: {geojson_file} not found, skipped")
+            continue
+        start = time.perf_counter()
+        path = ensure(state_name, geojson_file)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree = load_index(state_name, geojson_file)
+        print(f"  -> {state_name}: {len(tree.geometries)} waterbodies in {path} "
+              f"(ready in {built:.2f}s, loads in {time.perf_counter() - start:.3f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Scan-distortion augmentation for synthetic forms.
+
+Turns clean renders (e.g. from generate_forms.py) into realistic phone/scanner
+captures for stress-testing ai_service. Each source image is read once and
+expanded into ``--variants`` copies stacked in one NumPy batch. Every
+augmentation is then applied to a random subset of that batch according to its
+probability and strength, so text is never re-rendered and the per-pixel
+effects (noise, lighting) run vectorized over the whole stack.
+
+Augmentations, in application order: perspective, folds, stains, lighting,
+noise, jpeg. Probabilities and strengths (0..1) are set with ``--config``,
+a JSON file such as ``{"noise": {"p": 0.8, "strength": 0.5}}``; entries not
+given keep their defaults.
+
+Output mirrors the input tree: ``form_<n>_aug<k>.jpg`` next to a copy of the
+source's ground-truth ``.json`` label, plus ``manifest.jsonl`` recording which
+augmentations each variant received.
+
+Usage:
+    python augment_forms.py --input output/bulk --output output/augmented --variants 4 --seed 1
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_CONFIG = {
+    "perspective": {"p": 0.7, "strength": 0.4},
+    "folds": {"p": 0.3, "strength": 0.5},
+    "stains": {"p": 0.3, "strength": 0.5},
+    "lighting": {"p": 0.7, "strength": 0.5},
+    "noise": {"p": 0.6, "strength": 0.3},
+    "jpeg": {"p": 0.8, "strength": 0.5},
+}
+
+
+def perspective(batch, strength, rng):
+    """Camera tilt: move each corner inwards/outwards by up to 8% of the page"""
+    n, height, width = batch.shape[:3]
+    src = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    max_shift = 0.08 * strength * np.array([width, height], dtype=np.float32)
+    shifts = rng.uniform(-1, 1, size=(n, 4, 2)).astype(np.float32) * max_shift
+    for i in range(n):
+        matrix = cv2.getPerspectiveTransform(src, src + shifts[i])
+        batch[i] = cv2.warpPerspective(batch[i], matrix, (width, height), flags=cv2.INTER_LINEAR,
+                                       borderMode=cv2.BORDER_REPLICATE)
+    return batch
+
+
+def folds(batch, strength, rng):
+    """Paper folds: a thin crease with a shadow on one side, across or down the page"""
+    n, height, width = batch.shape[:3]
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    for i in range(n):
+        vertical = rng.random() < 0.5
+        position = rng.uniform(0.25, 0.75) * (width if vertical else height)
+        distance = (xs if vertical else ys) - position
+        spread = 2 + 30 * strength
+        fade = np.where(distance >= 0, np.exp(-np.abs(distance) / spread), 0.0)  # shadow falls on one side only
+        shade = 1.0 - 0.35 * strength * fade
+        crease = 1.0 - 0.5 * strength * np.exp(-(distance / 1.5) ** 2)
+        batch[i] = np.clip(batch[i] * (shade * crease)[..., None], 0, 255)
+    return batch
+
+
+def stains(batch, strength, rng):
+    """Coffee/water stains: soft tinted blobs multiplied into the page"""
+    n, height, width = batch.shape[:3]
+    for i in range(n):
+        mask = np.zeros((height, width), dtype=np.float32)
+        for _ in range(rng.integers(1, 4)):
+            center = (int(rng.uniform(0, width)), int(rng.uniform(0, height)))
+            axes = (int(rng.uniform(0.03, 0.12) * width), int(rng.uniform(0.03, 0.12) * height))
+            cv2.ellipse(mask, center, axes, float(rng.uniform(0, 180)), 0, 360, 1.0, -1)
+        mask = cv2.GaussianBlur(mask, (0, 0), sigmaX=max(1.0, 0.01 * width))
+        tint = np.array([0.55, 0.75, 0.9], dtype=np.float32)  # brownish in BGR
+        factor = 1.0 - (0.6 * strength * mask)[..., None] * (1.0 - tint)
+        batch[i] = np.clip(batch[i] * factor, 0, 255)
+    return batch
+
+
+def lighting(batch, strength, rng):
+    """Uneven illumination: a random linear gradient plus vignette, vectorized over the batch"""
+    n, height, width = batch.shape[:3]
+    ys = np.linspace(-1, 1, height, dtype=np.float32)[None, :, None]
+    xs = np.linspace(-1, 1, width, dtype=np.float32)[None, None, :]
+    angle = rng.uniform(0, 2 * np.pi, size=(n, 1, 1)).astype(np.float32)
+    gradient = np.cos(angle) * xs + np.sin(angle) * ys
+    vignette = xs ** 2 + ys ** 2
+    field = 1.0 - 0.25 * strength * (gradient + 1) - 0.2 * strength * vignette
+    field = field * rng.uniform(0.9, 1.1, size=(n, 1, 1)).astype(np.float32)
+    return np.clip(batch * field[..., None], 0, 255)
+
+
+def noise(batch, strength, rng):
+    """Sensor noise plus a sprinkle of salt-and-pepper, vectorized over the batch"""
+    batch = batch + rng.normal(0, 25 * strength, size=batch.shape).astype(np.float32)
+    speckle = rng.random(batch.shape[:3]) < 0.004 * strength
+    batch[speckle] = rng.choice([0, 255], size=(int(speckle.sum()), 1))
+    return np.clip(batch, 0, 255)
+
+
+def jpeg(batch, strength, rng):
+    """JPEG artifacts: re-encode at quality 90 down to 15"""
+    quality = int(90 - 75 * strength)
+    for i in range(len(batch)):
+        ok, encoded = cv2.imencode('.jpg', batch[i].astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            batch[i] = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    return batch
+
+
+AUGMENTATIONS = [
+    ("perspective", perspective),
+    ("folds", folds),
+    ("stains", stains),
+    ("lighting", lighting),
+    ("noise", noise),
+    ("jpeg", jpeg),
+]
+
+
+def load_config(path=None):
+    """Default probabilities/strengths, overridden per augmentation from a JSON file"""
+    config = {name: dict(settings) for name, settings in DEFAULT_CONFIG.items()}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for name, settings in json.load(f).items():
+                if name not in config:
+                    raise ValueError(f"Unknown augmentation: {name}")
+                config[name].update(settings)
+    return config
+
+
+def augment(image, variants, config, rng):
+    """Expand one image into ``variants`` augmented copies
+
+    Returns ``(batch, applied)``: a uint8 array of shape (variants, H, W, 3) and,
+    per variant, the augmentations it received.
+    """
+    batch = np.repeat(image[None].astype(np.float32), variants, axis=0)
+    applied = [[] for _ in range(variants)]
+    for name, function in AUGMENTATIONS:
+        settings = config[name]
+        if settings["p"] <= 0 or settings["strength"] <= 0:
+            continue
+        selected = np.flatnonzero(rng.random(variants) < settings["p"])
+        if len(selected) == 0:
+            continue
+        batch[selected] = function(batch[selected], settings["strength"], rng)
+        for index in selected:
+            applied[index].append(name)
+    return batch.astype(np.uint8), applied
+
+
+def augment_file(task):
+    """Worker: augment one source image and write its variants; returns manifest entries"""
+    source_path, source_index, input_dir, output_dir, variants, config, seed, quality = task
+    image = cv2.imread(source_path, cv2.IMREAD_COLOR)
+    if image is None:
+        return []
+
+    rng = np.random.default_rng([seed, source_index])
+    batch, applied = augment(image, variants, config, rng)
+
+    relative = os.path.relpath(source_path, input_dir)
+    stem = os.path.splitext(os.path.join(output_dir, relative))[0]
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    label_path = os.path.splitext(source_path)[0] + '.json'
+
+    entries = []
+    for k in range(variants):
+        out_path = f"{stem}_aug{k:02d}.jpg"
+        cv2.imwrite(out_path, batch[k], [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if os.path.exists(label_path):
+            shutil.copyfile(label_path, f"{stem}_aug{k:02d}.json")
+        entries.append({
+            "image": os.path.relpath(out_path, output_dir),
+            "source": relative,
+            "augmentations": applied[k]
+        })
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', required=True, help='Directory of rendered forms (searched recursively)')
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--variants', type=int, default=4, help='Augmented copies per source image')
+    parser.add_argument('--config', help='JSON file with per-augmentation {"p", "strength"} overrides')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--quality', type=int, default=95, help='JPEG quality of the written files')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    sources = sorted(
+        path for pattern in ('*.png', '*.jpg', '*.jpeg')
+        for path in glob.glob(os.path.join(args.input, '**', pattern), recursive=True)
+    )
+    if not sources:
+        print(f"No images found in {args.input}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    tasks = [
+        (path, index, args.input, args.output, args.variants, config, args.seed, args.quality)
+        for index, path in enumerate(sources)
+    ]
+
+    start = time.perf_counter()
+    written = 0
+    with open(os.path.join(args.output, 'manifest.jsonl'), 'w', encoding='utf-8') as manifest:
+        if args.workers > 1:
+            pool = multiprocessing.Pool(args.workers)
+            results = pool.imap_unordered(augment_file, tasks, chunksize=4)
+        else:
+            pool = None
+            results = map(augment_file, tasks)
+        try:
+            for entries in results:
+                for entry in entries:
+                    manifest.write(json.dumps(entry) + "\n")
+                written += len(entries)
+                elapsed = time.perf_counter() - start
+                print(f"\r{written} images, {written / elapsed:.1f} images/s", end="", flush=True)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    print()
+
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "sources": len(sources),
+        "images": written,
+        "seconds": round(elapsed, 2),
+        "images_per_second": round(written / elapsed, 1) if elapsed else 0.0,
+        "config": config
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Field values and labels of the synthetic FRA claim form, shared by the form
+generators.
+
+``form_sections`` draws one form's values (the same fields, order and
+vocabulary as new.py) from a Faker instance and an RNG. It has no imaging
+dependencies, so text-only generators such as generate_ner_corpus.py can
+use it without PIL; generate_forms.py renders its output.
+"""
+
+from datetime import date
+
+# Dates are drawn from a fixed range (new.py uses "this decade", which drifts)
+DATE_START, DATE_END = date(2020, 1, 1), date(2029, 12, 31)
+
+
+def form_seed(seed, index):
+    return seed * 1_000_003 + index
+
+
+def form_sections(fake, rng):
+    """Section title -> [(label, field, value)]; ``field`` is None for unlabelled rows
+
+    ``field`` is a tuple for the combined Age / Gender / Aadhaar row, whose value
+    is then the tuple of parts.
+    """
+    yes_no = lambda: rng.choice(["Yes", "No"])
+    when = lambda: fake.date_between_dates(DATE_START, DATE_END).strftime('%d/%m/%Y')
+    age, gender, aadhaar = rng.randint(18, 80), rng.choice(['Male', 'Female']), fake.random_number(digits=12)
+
+    return {
+        "1. Claimant Details": [
+            ("Name of Claimant:", "claimant_name", fake.name()),
+            ("Father’s / Husband’s Name:", "spouse_name", fake.name_male()),
+            ("Age / Gender / Aadhaar No:", ("age", "gender", "aadhaar_no"), (age, gender, aadhaar)),
+            ("Category:", "category", rng.choice(['ST', 'OTFD']))
+        ],
+        "2. Village & Administrative Details": [
+            ("Village:", "village", fake.city_suffix()),
+            ("Gram Panchayat:", "gram_panchayat", fake.city()),
+            ("Block / Tehsil:", "tehsil", fake.street_name()),
+            ("District:", "district", fake.city()),
+            ("State:", "state", fake.state())
+        ],
+        "3. Land Claim Details": [
+            ("Claim Type:", "claim_type", rng.choice(['IFR', 'CR', 'CFR'])),
+            ("Area of Land Claimed:", "land_claimed", f"{rng.randint(1, 20)} hectares / acres"),
+            ("Land Use:", "land_use", rng.choice(['Agriculture', 'Homestead', 'Mixed'])),
+            ("Boundary Description:", "boundary_description", fake.street_address()),
+            ("Geo-Coordinates (Lat, Long):", "geo_coordinates",
+             f"{round(rng.uniform(-90, 90), 4)}, {round(rng.uniform(-180, 180), 4)}")
+        ],
+        "4. Verification & Status": [
+            ("Verified by Gram Sabha?", "verified_by_gram_sabha", yes_no()),
+            ("Status of Claim:", "status_of_claim", rng.choice(['Pending', 'Approved', 'Rejected'])),
+            ("Date of Submission:", "date_of_submission", when()),
+            ("Date of Decision:", "date_of_decision", when()),
+            ("Patta / Title No.:", "patta_title_no", fake.bothify(text='??#####'))
+        ],
+        "5. Assets": [
+            ("Nearby Water Body:", "water_body", rng.choice(['Pond', 'Stream', 'River'])),
+            ("Irrigation Source:", "irrigation_source", rng.choice(['Well', 'Canal', 'Borewell'])),
+            ("Infrastructure Present:", "infrastructure_present",
+             rng.choice(['Road', 'Borewell', 'School', 'Health Center'])),
+            ("PM-KISAN:", "pm_kisan", yes_no()),
+            ("MGNREGA:", "mgnrega", yes_no()),
+            ("Jal Jeevan Mission:", "jal_jeevan_mission", yes_no()),
+            ("DAJGUA Benefit:", "dajgua_benefit", yes_no())
+        ],
+        "6. Signatures": [
+            ("Claimant Signature / Thumb:", None, fake.first_name()),
+            ("Gram Sabha Chairperson:", None, fake.name()),
+            ("Forest Dept. Officer:", None, fake.name()),
+            ("Revenue Dept. Officer:", None, fake.name())
+        ]
+    }
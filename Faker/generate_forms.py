@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Bulk synthetic FRA claim form generator with ground-truth labels.
+
+Renders forms with the same layout as new.py across a process pool and writes
+each ``form_<n>.png`` with a ``form_<n>.json`` label holding the field values
+under the names the extraction service returns. Files are sharded into
+``shard_<k>/`` directories. Every form draws its values from its own RNG seeded
+by (seed, form index), so a given seed always produces the same forms no matter
+how many workers render them.
+
+Usage:
+    python generate_forms.py --count 100000 --seed 42 --output output/bulk --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from faker import Faker
+from PIL import Image, ImageDraw, ImageFont
+
+from form_values import form_seed, form_sections
+
+WIDTH, HEIGHT = 1000, 1800
+TITLE = "FRA CLAIM FORM – 2006"
+SUBTITLE = "(For Individual / Community / Community Forest Resource Rights)"
+
+# Per-worker state, set up once by init_worker
+fake = None
+fonts = None
+
+
+def load_fonts():
+    """Form fonts (with fallbacks), as in new.py"""
+    try:
+        return {
+            "header": ImageFont.truetype("arialbd.ttf", 28),
+            "subheader": ImageFont.truetype("ariali.ttf", 18),
+            "section": ImageFont.truetype("arialbd.ttf", 22),
+            "label": ImageFont.truetype("arial.ttf", 18),
+        }
+    except OSError:
+        default = ImageFont.load_default()
+        return {"header": default, "subheader": default, "section": default, "label": default}
+
+
+def init_worker():
+    """Create the Faker instance and load fonts once per worker process"""
+    global fake, fonts
+    fake = Faker()
+    fonts = load_fonts()
+
+
+def render_form(sections):
+    """Draw a form (layout identical to new.py); returns (image, label)"""
+    image = Image.new("RGB", (WIDTH, HEIGHT), "white")
+    draw = ImageDraw.Draw(image)
+    font_label = fonts["label"]
+    label = {}
+
+    x, y = 60, 40
+    draw.text((x, y), TITLE, font=fonts["header"], fill="black")
+    y += 40
+    draw.text((x, y), SUBTITLE, font=fonts["subheader"], fill="black")
+    y += 50
+
+    for section, rows in sections.items():
+        draw.text((x, y), section, font=fonts["section"], fill="black")
+        y += 40
+        for text, field, value in rows:
+            if isinstance(field, tuple):
+                label.update(zip(field, (str(part) for part in value)))
+                value = " / ".join(str(part) for part in value)
+            elif field:
+                label[field] = value
+
+            draw.text((x + 40, y), text, font=font_label, fill="black")
+            bbox = draw.textbbox((x + 40, y), text, font=font_label)
+            line_x_start = x + 40 + (bbox[2] - bbox[0]) + 10
+            line_y = y + (bbox[3] - bbox[1]) + 10
+            draw.line((line_x_start, line_y, line_x_start + 300, line_y), fill="black", width=1)
+            draw.text((line_x_start + 5, y), value, font=font_label, fill="black")
+            y += 35
+        y += 25
+
+    return image, label
+
+
+def form_paths(output_dir, index, shard_size):
+    shard_dir = os.path.join(output_dir, f"shard_{index // shard_size:04d}")
+    stem = os.path.join(shard_dir, f"form_{index:07d}")
+    return shard_dir, stem + ".png", stem + ".json"
+
+
+def generate_range(task):
+    """Worker: render forms ``start <= index < stop``; returns the number written"""
+    output_dir, seed, start, stop, shard_size = task
+    for index in range(start, stop):
+        value_seed = form_seed(seed, index)
+        fake.seed_instance(value_seed)
+        rng = random.Random(value_seed)
+
+        image, label = render_form(form_sections(fake, rng))
+        shard_dir, image_path, label_path = form_paths(output_dir, index, shard_size)
+        os.makedirs(shard_dir, exist_ok=True)
+        image.save(image_path)
+        with open(label_path, 'w', encoding='utf-8') as f:
+            json.dump(label, f, ensure_ascii=False, indent=2)
+    return stop - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, required=True, help='Number of forms to generate')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed; the same seed gives the same forms')
+    parser.add_argument('--output', default=os.path.join('output', 'bulk'))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shard-size', type=int, default=1000, help='Forms per shard directory')
+    parser.add_argument('--chunk-size', type=int, default=50, help='Forms handed to a worker at a time')
+    parser.add_argument('--start', type=int, default=0, help='First form index (to extend an existing set)')
+    args = parser.parse_args()
+
+    tasks = [
+        (args.output, args.seed, start, min(start + args.chunk_size, args.start + args.count), args.shard_size)
+        for start in range(args.start, args.start + args.count, args.chunk_size)
+    ]
+
+    start_time = time.perf_counter()
+    done = 0
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+            for written in pool.imap_unordered(generate_range, tasks):
+                done += written
+                elapsed = time.perf_counter() - start_time
+                print(f"\r{done}/{args.count} forms, {done / elapsed:.1f} forms/s", end="", flush=True)
+    else:
+        init_worker()
+        for task in tasks:
+            done += generate_range(task)
+    print()
+
+    elapsed = time.perf_counter() - start_time
+    print(json.dumps({
+        "forms": done,
+        "seed": args.seed,
+        "workers": args.workers,
+        "output": args.output,
+        "seconds": round(elapsed, 2),
+        "forms_per_second": round(done / elapsed, 1) if elapsed else 0.0
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Text-only NER training corpus generator for the claim form model.
+
+Builds OCR-like form text straight from the field vocabulary of the form
+generator (form_values.py, shared with generate_forms.py) without rendering
+images or importing PIL, and labels every field value with a character span. Label names are the CSV
+columns the pipelines use (CLAIMANT_NAME, VILLAGE, ...). OCR noise is injected
+the way the recognizer gets it wrong: the word confusions that
+``extraction_rules.CORRECTIONS`` repairs (``Vi11age``, ``0fficer``, ...), junk
+tokens, single-character swaps, and both the one-line-per-box layout of raw
+EasyOCR output and the merged "Label: value" layout of normalized text.
+
+Docs are written as sharded spaCy ``DocBin`` files (``shard_<k>.spacy``) from a
+process pool; each doc is seeded by (seed, doc index), so a seed always yields
+the same corpus. Train with e.g. ``python -m spacy train config.cfg
+--paths.train corpus/train --paths.dev corpus/dev``.
+
+Usage:
+    python generate_ner_corpus.py --docs 1000000 --output corpus/train --seed 1
+    python generate_ner_corpus.py --docs 20000 --output corpus/dev --seed 2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+
+import spacy
+from faker import Faker
+from spacy.tokens import DocBin
+
+from form_values import form_seed, form_sections
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipeline'))
+
+from extraction_rules import CORRECTIONS, OCR_JUNK  # noqa: E402
+
+# Correct word -> the misreadings the pipelines know how to repair
+CONFUSIONS = {}
+for confused, correct in CORRECTIONS.items():
+    CONFUSIONS.setdefault(correct, []).append(confused)
+
+_WORD_RE = re.compile(r'[A-Za-z0-9]+')
+
+# Generic recognizer character swaps applied inside values
+CHAR_SWAPS = {'l': '1', 'I': 'l', 'O': '0', 'o': '0', 'S': '5', 'B': '8', 'i': '1'}
+
+# Per-worker state, set up once by init_worker
+fake = None
+nlp = None
+
+
+def init_worker():
+    """Create the Faker instance and the blank tokenizer once per worker process"""
+    global fake, nlp
+    fake = Faker()
+    nlp = spacy.blank("en")
+
+
+def confuse_words(text, rng, rate):
+    """Replace known words with their OCR misreadings"""
+    def replace(match):
+        options = CONFUSIONS.get(match.group(0))
+        if options and rng.random() < rate:
+            return rng.choice(options)
+        return match.group(0)
+    return _WORD_RE.sub(replace, text)
+
+
+def confuse_chars(text, rng, rate):
+    """Swap a few characters for look-alikes"""
+    if rng.random() >= rate:
+        return text
+    chars = list(text)
+    positions = [i for i, ch in enumerate(chars) if ch in CHAR_SWAPS]
+    if positions:
+        i = rng.choice(positions)
+        chars[i] = CHAR_SWAPS[chars[i]]
+    return ''.join(chars)
+
+
+def build_example(fake, rng, confusion_rate=0.3, char_rate=0.05, junk_rate=0.05):
+    """One OCR-like form text and its ``(start, end, label)`` entity spans"""
+    merged = rng.random() < 0.5  # normalized layout: "Label: value" on one line
+    pieces = []
+    entities = []
+    length = 0
+
+    def add(text, label=None):
+        nonlocal length
+        if label:
+            entities.append((length, length + len(text), label))
+        pieces.append(text)
+        length += len(text)
+
+    add("FRA CLAIM FORM - 2006\n")
+    for section, rows in form_sections(fake, rng).items():
+        add(section + "\n")
+        for text, field, value in rows:
+            add(confuse_words(text, rng, confusion_rate))
+            add(" " if merged else "\n")
+            if isinstance(field, tuple):
+                for i, (name, part) in enumerate(zip(field, value)):
+                    if i:
+                        add(" / ")
+                    add(str(part), name.upper())
+            elif field:
+                value = confuse_chars(confuse_words(value, rng, confusion_rate), rng, char_rate)
+                add(value, field.upper())
+            else:
+                add(confuse_words(value, rng, confusion_rate))
+            if rng.random() < junk_rate:
+                add(" " + rng.choice(OCR_JUNK))
+            add("\n")
+    return "".join(pieces), entities
+
+
+def generate_shard(task):
+    """Worker: build docs ``start <= index < stop`` into one DocBin file"""
+    path, seed, start, stop, rates = task
+    doc_bin = DocBin(attrs=["ENT_IOB", "ENT_TYPE"], store_user_data=False)
+    dropped = 0
+    for index in range(start, stop):
+        value_seed = form_seed(seed, index)
+        fake.seed_instance(value_seed)
+        rng = random.Random(value_seed)
+
+        text, entities = build_example(fake, rng, *rates)
+        doc = nlp.make_doc(text)
+        spans = []
+        for start_char, end_char, label in entities:
+            span = doc.char_span(start_char, end_char, label=label, alignment_mode="contract")
+            if span is None:
+                dropped += 1
+            else:
+                spans.append(span)
+        doc.ents = spans
+        doc_bin.add(doc)
+    doc_bin.to_disk(path)
+    return stop - start, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, required=True, help='Number of labelled docs to generate')
+    parser.add_argument('--output', required=True, help='Directory for the shard_<k>.spacy files')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard-size', type=int, default=10000, help='Docs per DocBin file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--confusion-rate', type=float, default=0.3,
+                        help='Chance a known word is replaced by its OCR misreading')
+    parser.add_argument('--char-rate', type=float, default=0.05, help='Chance a value gets a look-alike swap')
+    parser.add_argument('--junk-rate', type=float, default=0.05, help='Chance a line gets a junk token')
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    rates = (args.confusion_rate, args.char_rate, args.junk_rate)
+    tasks = [
+        (os.path.join(args.output, f"shard_{start // args.shard_size:05d}.spacy"),
+         args.seed, start, min(start + args.shard_size, args.docs), rates)
+        for start in range(0, args.docs, args.shard_size)
+    ]
+
+    start_time = time.perf_counter()
+    done = dropped = 0
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+            for written, misaligned in pool.imap_unordered(generate_shard, tasks):
+                done += written
+                dropped += misaligned
+                elapsed = time.perf_counter() - start_time
+                print(f"\r{done}/{args.docs} docs, {done / elapsed:.0f} docs/s", end="", flush=True)
+    else:
+        init_worker()
+        for task in tasks:
+            written, misaligned = generate_shard(task)
+            done += written
+            dropped += misaligned
+    print()
+
+    elapsed = time.perf_counter() - start_time
+    print(json.dumps({
+        "docs": done,
+        "shards": len(tasks),
+        "dropped_spans": dropped,
+        "seed": args.seed,
+        "workers": args.workers,
+        "seconds": round(elapsed, 2),
+        "docs_per_hour": round(done / elapsed * 3600) if elapsed else 0
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Shared OCR text normalization and regex field extraction for FRA claim forms.
+
+backend/ai_service.py and the scripts in this folder all clean EasyOCR output
+and pull form fields out of it with regexes. This module is the single
+implementation they import. Every pattern is compiled once at import time.
+All OCR word corrections are applied in one pass through a combined
+alternation. Field extraction scans the text once for label keywords and only
+tries each rule where one of its labels starts, instead of running a separate
+``re.search`` per field. Value captures use bounded repetition, so a missing
+terminator cannot make a rule backtrack over the rest of the document.
+"""
+
+import re
+
+# --- OCR text normalization ---
+
+# Word-level OCR confusions seen on scanned forms (digit 1/0 for letter l/O)
+CORRECTIONS = {
+    '0fficer': 'Officer',
+    'Borewe11': 'Borewell',
+    'Ja1': 'Jal',
+    'C1aimant': 'Claimant',
+    'C1aim': 'Claim',
+    'Vi11age': 'Village',
+    'Distr1ct': 'District',
+    'Patt1': 'Patta',
+    'Tehs1l': 'Tehsil',
+    'Tehsi1': 'Tehsil',
+    'Is1and': 'Island',
+    'E11is': 'Ellis',
+    'B1ake': 'Blake',
+    'Rache1': 'Rachel',
+}
+
+# Recognizer junk removed wherever it appears, not only as a whole word
+OCR_JUNK = ['Lsngcirg']
+
+_BLANK_LINES_RE = re.compile(r'\n+')
+_RUN_OF_SPACES_RE = re.compile(r'[ ]{2,}')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPLIT_LABEL_RE = re.compile(r'(Age|Gender|Aadhaar No):\s*\n\s*(\S+)', re.IGNORECASE)
+_SIGNATURE_RE = re.compile(r'Claimant Signature', re.IGNORECASE)
+_CORRECTIONS_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(word) for word in sorted(CORRECTIONS, key=len, reverse=True)) + r')\b'
+    + ''.join('|' + re.escape(junk) for junk in OCR_JUNK)
+)
+
+
+def _correct(match):
+    return CORRECTIONS.get(match.group(0), '')
+
+
+def apply_corrections(text):
+    """Fix known OCR word confusions in a single pass over the text"""
+    return _CORRECTIONS_RE.sub(_correct, text)
+
+
+def collapse_whitespace(text):
+    return _WHITESPACE_RE.sub(' ', text)
+
+
+def normalize_ocr_text(text):
+    """Clean raw EasyOCR output into one line of form text
+
+    Joins labels that OCR split from their values, applies the OCR
+    corrections and drops everything from the claimant signature on.
+    """
+    if not text:
+        return ""
+
+    text = _BLANK_LINES_RE.sub('\n', text)
+    text = _RUN_OF_SPACES_RE.sub(' ', text)
+    text = _SPLIT_LABEL_RE.sub(r'\1: \2', text)
+
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    merged_lines = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.endswith(':') and i + 1 < len(lines):
+            next_line = lines[i + 1]
+            if not next_line.endswith(':'):
+                line = f"{line} {next_line}"
+                i += 1
+        merged_lines.append(line)
+        i += 1
+
+    text = apply_corrections(' '.join(merged_lines))
+    return _SIGNATURE_RE.split(text, 1)[0]
+
+
+# --- Field extraction ---
+
+def _leading_group(pattern):
+    """Return the leading ``(?:...)`` label group of a rule pattern, or None"""
+    if not pattern.startswith('(?:'):
+        return None
+    depth = 0
+    escaped = False
+    for index, char in enumerate(pattern):
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return pattern[:index + 1]
+    return None
+
+
+def _first_chars(group):
+    """Lowercased first characters of a label group's top-level alternatives
+
+    Returns None unless every alternative starts with a plain literal character.
+    """
+    alternatives = []
+    depth = 0
+    current = ''
+    for char in group[3:-1]:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == '|' and depth == 0:
+            alternatives.append(current)
+            current = ''
+        else:
+            current += char
+    alternatives.append(current)
+
+    chars = set()
+    for alternative in alternatives:
+        if not alternative or not (alternative[0].isalnum() or alternative[0] == ' '):
+            return None
+        chars.add(alternative[0].lower())
+    return chars
+
+
+def _lower_literals(pattern):
+    """Lowercase a pattern's literal characters, leaving escapes such as ``\\S`` intact"""
+    chars = []
+    escaped = False
+    for char in pattern:
+        chars.append(char if escaped else char.lower())
+        escaped = not escaped and char == '\\'
+    return ''.join(chars)
+
+
+class FieldRules:
+    """A compiled set of ``field -> pattern`` extraction rules
+
+    Each pattern starts with a ``(?:label|...)`` group and captures the value in
+    group 1. ``extract`` returns the same values as running ``re.search`` for
+    every rule, but walks the text once: a scan over the union of the label
+    groups finds every position where some rule could start, and only the
+    rules whose labels can begin with the character there are tried, with an
+    anchored ``match``. The scan runs case-sensitively over a lowercased copy
+    of the text so the regex engine can skip ahead on its first-character set.
+    """
+
+    def __init__(self, patterns, flags=re.IGNORECASE | re.MULTILINE):
+        self.patterns = dict(patterns)
+        self.flags = flags
+        self.fields = list(self.patterns)
+        self._rules = [(field, re.compile(pattern, flags)) for field, pattern in self.patterns.items()]
+
+        self._scan = None  # without a usable label index, fall back to one search per rule
+        labels = [_leading_group(pattern) for pattern in self.patterns.values()]
+        first_chars = [_first_chars(label) if label else None for label in labels]
+        if all(first_chars) and flags & re.IGNORECASE:
+            self._rules_by_char = {}
+            for rule, chars in zip(self._rules, first_chars):
+                for char in chars:
+                    self._rules_by_char.setdefault(char, []).append(rule)
+            self._scan = re.compile('|'.join(_lower_literals(label) for label in labels), flags & ~re.IGNORECASE)
+
+    def renamed(self, names):
+        """A rule set with only the fields in ``names``, renamed ``old -> new``"""
+        return FieldRules({new: self.patterns[old] for old, new in names.items()}, self.flags)
+
+    def extract(self, text):
+        """Return ``{field: value}`` for every rule that matches ``text``"""
+        if not text:
+            return {}
+
+        found = {}
+        folded = text.lower()
+        if self._scan is None or len(folded) != len(text):
+            for field, regex in self._rules:
+                match = regex.search(text)
+                if match:
+                    found[field] = match.group(1).strip()
+        else:
+            remaining = len(self._rules)
+            position = 0
+            while remaining:
+                hit = self._scan.search(folded, position)
+                if hit is None:
+                    break
+                position = hit.start()
+                for field, regex in self._rules_by_char.get(folded[position], ()):
+                    if field in found:
+                        continue
+                    match = regex.match(text, position)
+                    if match:
+                        found[field] = match.group(1).strip()
+                        remaining -= 1
+                position += 1  # labels may overlap, so resume right after this start
+
+        return {field: found[field] for field in self.fields if field in found}
+
+
+# Bounded building blocks; a value never spans more than a line of a form
+_SEP = r"[:\s]{0,10}"
+_WORDS = r"[A-Za-z\s]{1,80}?"
+
+# Field rules for the service and the NER pipelines (database column names)
+FORM_FIELD_RULES = FieldRules({
+    'claimant_name': rf"(?:Name|Claimant|नाम){_SEP}({_WORDS})(?:\n|$|Father|Husband)",
+    'spouse_name': rf"(?:Father|Husband|पिता|पति){_SEP}(?:Name|नाम)?{_SEP}({_WORDS})(?:\n|$)",
+    'village': rf"(?:Village|गांव|ग्राम){_SEP}({_WORDS})(?:\n|$|,)",
+    'gram_panchayat': rf"(?:Panchayat|पंचायत|Gram\s{{0,3}}Panchayat){_SEP}({_WORDS})(?:\n|$|,)",
+    'tehsil': rf"(?:Tehsil|Block|तहसील|ब्लॉक){_SEP}({_WORDS})(?:\n|$|,)",
+    'district': rf"(?:District|जिला){_SEP}({_WORDS})(?:\n|$|,)",
+    'state': rf"(?:State|राज्य){_SEP}({_WORDS})(?:\n|$|,)",
+    'land_claimed': rf"(?:Area|Land\s{{0,3}}Area|क्षेत्र){_SEP}([0-9.]{{1,12}}\s{{0,3}}(?:hectare|acre|हेक्टेयर|एकड़)?)",
+    'patta_title_no': rf"(?:Khasra|Patta|खसरा|पट्टा){_SEP}(?:No|Number|संख्या)?{_SEP}([A-Za-z0-9/\-]{{1,30}})",
+    'aadhaar_no': rf"(?:Aadhaar|Adhar|आधार){_SEP}(?:No|Number|संख्या)?{_SEP}([0-9\s]{{1,20}})",
+    'category': rf"(?:Category|Caste|श्रेणी|जाति){_SEP}([A-Za-z0-9\s]{{1,60}})",
+    'claim_type': rf"(?:Claim\s{{0,3}}Type|Type\s{{0,3}}of\s{{0,3}}Claim|दावे का प्रकार){_SEP}([A-Za-z\s]{{1,60}})",
+    'land_use': rf"(?:Land\s{{0,3}}Use|Use\s{{0,3}}of\s{{0,3}}Land|भूमि का उपयोग){_SEP}([A-Za-z\s]{{1,60}})",
+    'annual_income': rf"(?:Annual\s{{0,3}}Income|Income|वार्षिक आय){_SEP}([0-9,]{{1,20}})",
+    'tax_payer': rf"(?:Tax\s{{0,3}}Payer|Taxpayer|करदाता){_SEP}(Yes|No|हाँ|नहीं)",
+    'status_of_claim': rf"(?:Status|Status\s{{0,3}}of\s{{0,3}}Claim|स्थिति){_SEP}(Approved|Rejected|Pending|मंजूर|अस्वीकृत|लंबित)",
+})
+
+# The same rules under the field names process_image_simple.py reports
+SIMPLE_FIELD_RULES = FORM_FIELD_RULES.renamed({
+    'claimant_name': 'name',
+    'spouse_name': 'father_husband_name',
+    'village': 'village',
+    'gram_panchayat': 'panchayat',
+    'tehsil': 'tehsil',
+    'district': 'district',
+    'state': 'state',
+    'land_claimed': 'area_of_land',
+    'patta_title_no': 'khasra_number',
+})
+
+# Rules for the CSV columns written by simple_pipeline.py
+CSV_FIELD_RULES = FieldRules({
+    'CLAIMANT_NAME': rf"(?:Claimant\s{{0,3}}Name|Name|Applicant){_SEP}([A-Za-z\s']{{1,80}}?)(?:\n|$|Spouse|Father)",
+    'SPOUSE_NAME': rf"(?:Spouse\s{{0,3}}Name|Father.{{0,20}}Name|Husband.{{0,20}}Name){_SEP}({_WORDS})(?:\n|$|Gender|Age)",
+    'GENDER': rf"(?:Gender|Sex){_SEP}(Male|Female|Other)",
+    'AADHAAR_NO': rf"(?:Aadhaar|Aadhar|UID){_SEP}(\d{{12}})",
+    'CATEGORY': rf"(?:Category|Caste){_SEP}([A-Z]{{2,4}})",
+    'VILLAGE': rf"(?:Village|Gram){_SEP}({_WORDS})(?:\n|$|Gram|Panchayat)",
+    'GRAM_PANCHAYAT': rf"(?:Gram\s{{0,3}}Panchayat|Panchayat|GP){_SEP}({_WORDS})(?:\n|$|Tehsil|Block)",
+    'TEHSIL': rf"(?:Tehsil|Taluka|Block){_SEP}({_WORDS})(?:\n|$|District)",
+    'DISTRICT': rf"(?:District|Zilla){_SEP}({_WORDS})(?:\n|$|State)",
+    'STATE': rf"(?:State|Pradesh){_SEP}({_WORDS})(?:\n|$|Claim|Type)",
+    'CLAIM_TYPE': rf"(?:Claim\s{{0,3}}Type|Type\s{{0,3}}of\s{{0,3}}Claim){_SEP}(CFR|IFR|CR)",
+    'LAND_CLAIMED': rf"(?:Land\s{{0,3}}Claimed|Area\s{{0,3}}Claimed|Land\s{{0,3}}Area){_SEP}([\d.]{{1,12}}\s{{0,3}}(?:hectares?|acres?|ha))",
+    'LAND_USE': rf"(?:Land\s{{0,3}}Use|Use\s{{0,3}}of\s{{0,3}}Land){_SEP}({_WORDS})(?:\n|$|Annual)",
+    'ANNUAL_INCOME': rf"(?:Annual\s{{0,3}}Income|Income){_SEP}(?:Rs\.?\s{{0,3}})?(\d{{1,15}})",
+    'BOUNDARY_DESCRIPTION': rf"(?:Boundary.{{0,20}}Description|Boundaries){_SEP}([^:\n]{{1,200}}?)(?:\n|$|Geo)",
+    'GEO_COORDINATES': rf"(?:Geo.{{0,20}}Coordinates|GPS|Lat.{{0,20}}Long){_SEP}([\d.\s,\-]{{1,40}})",
+    'STATUS_OF_CLAIM': rf"(?:Status.{{0,20}}Claim|Status){_SEP}(Pending|Approved|Rejected)",
+    'DATE_OF_SUBMISSION': rf"(?:Date.{{0,20}}Submission|Submitted.{{0,20}}Date){_SEP}([\d/\-]{{1,12}})",
+    'DATE_OF_DECISION': rf"(?:Date.{{0,20}}Decision|Decision.{{0,20}}Date){_SEP}([\d/\-]{{1,12}})",
+    'PATTA_TITLE_NO': rf"(?:Patta.{{0,20}}No|Title.{{0,20}}No|Document.{{0,20}}No){_SEP}([A-Za-z0-9]{{1,30}})",
+    'WATER_BODY': rf"(?:Water\s{{0,3}}Body|Water\s{{0,3}}Source){_SEP}({_WORDS})(?:\n|$|Irrigation)",
+    'IRRIGATION_SOURCE': rf"(?:Irrigation.{{0,20}}Source|Irrigation){_SEP}({_WORDS})(?:\n|$|Infrastructure)",
+    'INFRASTRUCTURE_PRESENT': rf"(?:Infrastructure.{{0,20}}Present|Infrastructure){_SEP}([A-Za-z\s,]{{1,120}}?)(?:\n|$)",
+})
+
+BOUNDARY_RE = re.compile(
+    rf"(?:North|South|East|West|उत्तर|दक्षिण|पूर्व|पश्चिम){_SEP}([A-Za-z\s,]{{1,120}}?)(?:\n|$)",
+    re.IGNORECASE | re.MULTILINE
+)
+BOUNDARY_SIDES = ('North', 'South', 'East', 'West')
+
+
+def extract_boundaries(text):
+    """Boundary descriptions in the order they appear, read as North, South, East, West"""
+    if not text:
+        return []
+    return [value.strip() for value in BOUNDARY_RE.findall(text)][:len(BOUNDARY_SIDES)]
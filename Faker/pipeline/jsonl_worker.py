@@ -0,0 +1,61 @@
+"""
+JSON-lines worker loop shared by the pipeline scripts' ``--serve`` mode.
+
+The Node backend keeps a few of these processes warm instead of spawning one
+per upload, so spaCy and EasyOCR are loaded once per worker. Protocol, one JSON
+object per line:
+
+    stdout  {"ready": true, "pid": 1234}             once models are loaded
+    stdin   {"id": "7", "image_path": "/tmp/a.png"}  or {"id": "7", "image_base64": "..."}
+    stdout  {"id": "7", "success": true, ...}        one reply per request, same id
+
+Anything the models print while working is redirected to stderr so stdout only
+ever carries protocol lines. The worker exits when stdin is closed.
+"""
+
+import base64
+import json
+import os
+import sys
+
+
+def read_image_input(request):
+    """Image path or raw bytes from a request; EasyOCR's readtext accepts both"""
+    if request.get("image_base64"):
+        return base64.b64decode(request["image_base64"])
+    image_path = request.get("image_path")
+    if not image_path:
+        raise ValueError("Request needs image_path or image_base64")
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+    return image_path
+
+
+def serve(process, stdin=None, stdout=None):
+    """Answer requests from ``stdin`` with ``process(image)`` until EOF
+
+    ``process`` takes a path or image bytes and returns a JSON-serializable dict.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    sys.stdout = sys.stderr  # keep stray prints off the protocol stream
+
+    def reply(message):
+        stdout.write(json.dumps(message, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+    reply({"ready": True, "pid": os.getpid()})
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = process(read_image_input(request))
+        except Exception as e:
+            result = {"success": False, "error": str(e), "extracted_data": {}}
+        reply({"id": request_id, **result})
@@ -1,65 +1,36 @@
+import atexit
 import spacy
 import easyocr
 import os
+import sys
 import json
 import pandas as pd
-import re
+
+from columnar_output import ParquetClaimWriter
+from extraction_rules import normalize_ocr_text
 
 # Paths for model and output
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model-best", "content", "model-best")
 OUTPUT_CSV = os.path.join(os.path.dirname(__file__), "fra_data.csv")
+OUTPUT_PARQUET = os.path.join(os.path.dirname(__file__), "fra_data_parquet")  # used with --parquet
 IMAGE_PATH = os.path.join(os.path.dirname(__file__), "output_new.png")
 
 # Load the trained NER model
 nlp = spacy.load(MODEL_PATH)
 
-# Function to extract text from image using EasyOCR
-def extract_text_from_image(image_path):
-    reader = easyocr.Reader(['en'])
-    result = reader.readtext(image_path, detail=0)
-    return "\n".join(result)
-
-# Function to clean and preprocess OCR text
-def preprocess_ocr_text(text):
-    text = re.sub(r'\n+', '\n', text)
-    text = re.sub(r'[ ]{2,}', ' ', text)
-    text = re.sub(r'(Age|Gender|Aadhaar No):\s*\n\s*(\S+)', r'\1: \2', text, flags=re.IGNORECASE)
-
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    merged_lines = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if line.endswith(':') and i + 1 < len(lines):
-            next_line = lines[i + 1]
-            if not next_line.endswith(':'):
-                line = f"{line} {next_line}"
-                i += 1
-        merged_lines.append(line)
-        i += 1
+# EasyOCR reader, created once on first use
+reader = None
 
-    text = ' '.join(merged_lines)
+def get_reader():
+    global reader
+    if reader is None:
+        reader = easyocr.Reader(['en'])
+    return reader
 
-    # Common OCR corrections
-    corrections = {
-        r'\b0fficer\b': 'Officer',
-        r'\bBorewe11\b': 'Borewell',
-        r'\bJa1\b': 'Jal',
-        r'\bC1aimant\b': 'Claimant',
-        r'\bC1aim\b': 'Claim',
-        r'\bVi11age\b': 'Village',
-        r'\bTehsi1\b': 'Tehsil',
-        r'\bIs1and\b': 'Island',
-        r'\bE11is\b': 'Ellis',
-        r'\bB1ake\b': 'Blake',
-        r'\bRache1\b': 'Rachel',
-        r'Lsngcirg': ''
-    }
-    for pattern, repl in corrections.items():
-        text = re.sub(pattern, repl, text)
-
-    text = re.split(r'Claimant Signature', text, flags=re.IGNORECASE)[0]
-    return text
+# Function to extract text from image using EasyOCR (path or encoded image bytes)
+def extract_text_from_image(image_path):
+    result = get_reader().readtext(image_path, detail=0)
+    return "\n".join(result)
 
 # Function to extract entities using the NER model
 def extract_ner_fields(text, nlp):
@@ -83,9 +54,44 @@ def save_to_csv(entities, csv_file):
     else:
         df.to_csv(csv_file, mode='a', header=False, index=False)
 
+# Function to save extracted entities to the state-partitioned Parquet dataset;
+# one writer per run batches records into row groups and closes at exit
+parquet_writer = None
+
+def save_to_parquet(entities, output_dir):
+    global parquet_writer
+    if not entities:
+        return
+    if parquet_writer is None:
+        parquet_writer = ParquetClaimWriter(output_dir)
+        atexit.register(parquet_writer.close)
+    parquet_writer.write(entities)
+
+# Full extraction for one image, as returned to --serve clients
+def process_image(image):
+    text = extract_text_from_image(image)
+    if not text:
+        return {"success": False, "error": "Failed to extract text from image", "extracted_data": {}}
+    clean_text = normalize_ocr_text(text)
+    return {
+        "success": True,
+        "extracted_data": extract_ner_fields(clean_text, nlp),
+        "raw_text": text[:500]
+    }
+
 # Main process
 if __name__ == "__main__":
+    if "--serve" in sys.argv[1:]:
+        # Persistent worker: JSON-lines requests on stdin, one result per line on stdout
+        from jsonl_worker import serve
+        get_reader()
+        serve(process_image)
+        sys.exit(0)
+
     text = extract_text_from_image(IMAGE_PATH)
-    clean_text = preprocess_ocr_text(text)
+    clean_text = normalize_ocr_text(text)
     extracted_entities = extract_ner_fields(clean_text, nlp)
-    save_to_csv(extracted_entities, OUTPUT_CSV)
+    if "--parquet" in sys.argv[1:]:
+        save_to_parquet(extracted_entities, OUTPUT_PARQUET)
+    else:
+        save_to_csv(extracted_entities, OUTPUT_CSV)
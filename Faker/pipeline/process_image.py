@@ -3,9 +3,10 @@ import json
 import spacy
 import easyocr
 import os
-import re
 from pathlib import Path
 
+from extraction_rules import normalize_ocr_text
+
 # Get the directory of this script
 SCRIPT_DIR = Path(__file__).parent
 
@@ -28,46 +29,6 @@ def extract_text_from_image(image_path):
     except Exception as e:
         return None
 
-def preprocess_ocr_text(text):
-    """Clean and preprocess OCR text"""
-    if not text:
-        return ""
-
-    text = re.sub(r'\n+', '\n', text)
-    text = re.sub(r'[ ]{2,}', ' ', text)
-    text = re.sub(r'(Age|Gender|Aadhaar No):\s*\n\s*(\S+)', r'\1: \2', text, flags=re.IGNORECASE)
-
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    merged_lines = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if line.endswith(':') and i + 1 < len(lines):
-            next_line = lines[i + 1]
-            if not next_line.endswith(':'):
-                line = f"{line} {next_line}"
-                i += 1
-        merged_lines.append(line)
-        i += 1
-
-    text = ' '.join(merged_lines)
-
-    # Common OCR corrections
-    corrections = {
-        r'\b0fficer\b': 'Officer',
-        r'\bBorewe11\b': 'Borewell',
-        r'\bJa1\b': 'Jal',
-        r'\bC1aimant\b': 'Claimant',
-        r'\bC1aim\b': 'Claim',
-        r'\bVi11age\b': 'Village',
-        r'\bTehsi1\b': 'Tehsil',
-    }
-    for pattern, repl in corrections.items():
-        text = re.sub(pattern, repl, text)
-
-    text = re.split(r'Claimant Signature', text, flags=re.IGNORECASE)[0]
-    return text
-
 def extract_ner_fields(text):
     """Extract entities using the NER model"""
     if not text:
@@ -118,7 +79,7 @@ def process_image(image_path):
             }
 
         # Preprocess text
-        clean_text = preprocess_ocr_text(text)
+        clean_text = normalize_ocr_text(text)
 
         # Extract entities
         extracted_data = extract_ner_fields(clean_text)
@@ -2,9 +2,10 @@ import sys
 import json
 import easyocr
 import os
-import re
 from pathlib import Path
 
+from extraction_rules import BOUNDARY_SIDES, SIMPLE_FIELD_RULES, extract_boundaries
+
 # Initialize EasyOCR reader
 try:
     reader = easyocr.Reader(['en'])
@@ -21,48 +22,20 @@ def extract_text_from_image(image_path):
         return None
 
 def extract_fields_from_text(text):
-    """Extract fields using regex patterns"""
+    """Extract fields using the shared regex rules"""
     if not text:
         return {}
 
-    data = {}
-
-    # Common patterns for FRA forms
-    patterns = {
-        'name': r"(?:Name|Claimant|नाम)[:\s]*([A-Za-z\s]+?)(?:\n|$|Father|Husband)",
-        'father_husband_name': r"(?:Father|Husband|पिता|पति)[:\s]*(?:Name|नाम)?[:\s]*([A-Za-z\s]+?)(?:\n|$)",
-        'village': r"(?:Village|गांव|ग्राम)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'panchayat': r"(?:Panchayat|पंचायत|Gram\s*Panchayat)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'tehsil': r"(?:Tehsil|Block|तहसील|ब्लॉक)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'district': r"(?:District|जिला)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'state': r"(?:State|राज्य)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'area_of_land': r"(?:Area|Land\s*Area|क्षेत्र)[:\s]*([0-9.]+\s*(?:hectare|acre|हेक्टेयर|एकड़)?)",
-        'khasra_number': r"(?:Khasra|Patta|खसरा|पट्टा)[:\s]*(?:No|Number|संख्या)?[:\s]*([A-Za-z0-9/\-]+)",
-    }
-
-    for field, pattern in patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            data[field] = match.group(1).strip()
-
-    # Try to extract boundaries
-    boundary_pattern = r"(?:North|South|East|West|उत्तर|दक्षिण|पूर्व|पश्चिम)[:\s]*([A-Za-z\s,]+?)(?:\n|$)"
-    boundaries = re.findall(boundary_pattern, text, re.IGNORECASE | re.MULTILINE)
-
-    if boundaries:
-        if len(boundaries) > 0:
-            data['boundary_north'] = boundaries[0].strip() if boundaries else ''
-        if len(boundaries) > 1:
-            data['boundary_south'] = boundaries[1].strip()
-        if len(boundaries) > 2:
-            data['boundary_east'] = boundaries[2].strip()
-        if len(boundaries) > 3:
-            data['boundary_west'] = boundaries[3].strip()
+    data = SIMPLE_FIELD_RULES.extract(text)
+
+    # Boundaries are listed North, South, East, West
+    for side, value in zip(BOUNDARY_SIDES, extract_boundaries(text)):
+        data[f'boundary_{side.lower()}'] = value
 
     return data
 
 def process_image(image_path):
-    """Main processing function"""
+    """Main processing function; accepts an image path or encoded image bytes"""
     try:
         # Extract text from image
         text = extract_text_from_image(image_path)
@@ -90,6 +63,12 @@ def process_image(image_path):
         }
 
 if __name__ == "__main__":
+    if "--serve" in sys.argv[1:]:
+        # Persistent worker: JSON-lines requests on stdin, one result per line on stdout
+        from jsonl_worker import serve
+        serve(process_image)
+        sys.exit(0)
+
     if len(sys.argv) < 2:
         print(json.dumps({"error": "Image path required"}))
         sys.exit(1)
@@ -2,15 +2,30 @@
 """
 Simple OCR pipeline that extracts text from images and generates CSV
 Works without spacy - uses EasyOCR and regex patterns
+
+Without arguments a single image (output_new.png) is processed. Given
+directories, files or glob patterns it runs in batch mode:
+
+    python simple_pipeline.py scans/ "more/**/*.jpg" --output claims.csv --workers 4
+
+Batch mode streams one CSV row per image as it finishes and records finished
+images in a checkpoint file, so rerunning the same command after an
+interruption skips work that is already in the CSV.
 """
 
+import argparse
+import glob
+import multiprocessing
 import os
 import sys
 import json
 import csv
-import re
+import time
 from datetime import datetime
 
+from columnar_output import ParquetClaimWriter
+from extraction_rules import CSV_FIELD_RULES, collapse_whitespace
+
 try:
     import easyocr
     HAS_EASYOCR = True
@@ -22,6 +37,32 @@ except ImportError:
 IMAGE_PATH = os.path.join(os.path.dirname(__file__), "output_new.png")
 OUTPUT_CSV = os.path.join(os.path.dirname(__file__), "fra_data.csv")
 
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# CSV columns, in output order
+REQUIRED_COLUMNS = [
+    'CLAIMANT_NAME', 'SPOUSE_NAME', 'GENDER', 'AADHAAR_NO', 'CATEGORY',
+    'VILLAGE', 'GRAM_PANCHAYAT', 'TEHSIL', 'DISTRICT', 'STATE',
+    'CLAIM_TYPE', 'LAND_CLAIMED', 'LAND_USE', 'ANNUAL_INCOME',
+    'BOUNDARY_DESCRIPTION', 'GEO_COORDINATES', 'STATUS_OF_CLAIM',
+    'DATE_OF_SUBMISSION', 'DATE_OF_DECISION', 'PATTA_TITLE_NO',
+    'WATER_BODY', 'IRRIGATION_SOURCE', 'INFRASTRUCTURE_PRESENT'
+]
+
+# EasyOCR reader, created once per process
+reader = None
+
+def get_reader():
+    """Shared EasyOCR reader for this process"""
+    global reader
+    if reader is None:
+        reader = easyocr.Reader(['en'], gpu=False)
+    return reader
+
+def ocr_image(image_path):
+    """Run EasyOCR on one image; errors propagate to the caller"""
+    return "\n".join(get_reader().readtext(image_path, detail=0))
+
 def extract_text_from_image(image_path):
     """Extract text from image using EasyOCR"""
     if not HAS_EASYOCR:
@@ -32,11 +73,7 @@ def extract_text_from_image(image_path):
         return ""
 
     try:
-        reader = easyocr.Reader(['en'], gpu=False)
-        result = reader.readtext(image_path, detail=0)
-        text = "\n".join(result)
-        print(f"Extracted {len(result)} text blocks from image")
-        return text
+        return ocr_image(image_path)
     except Exception as e:
         print(f"Error extracting text: {e}")
         return generate_mock_text()
@@ -69,45 +106,17 @@ def generate_mock_text():
     """
 
 def extract_fields_from_text(text):
-    """Extract fields using regex patterns"""
-
-    # Define patterns for each field
-    patterns = {
-        'CLAIMANT_NAME': r'(?:Claimant\s*Name|Name|Applicant)[:\s]*([A-Za-z\s\']+?)(?:\n|$|Spouse|Father)',
-        'SPOUSE_NAME': r'(?:Spouse\s*Name|Father.*Name|Husband.*Name)[:\s]*([A-Za-z\s]+?)(?:\n|$|Gender|Age)',
-        'GENDER': r'(?:Gender|Sex)[:\s]*(Male|Female|Other)',
-        'AADHAAR_NO': r'(?:Aadhaar|Aadhar|UID)[:\s]*(\d{12})',
-        'CATEGORY': r'(?:Category|Caste)[:\s]*([A-Z]{2,4})',
-        'VILLAGE': r'(?:Village|Gram)[:\s]*([A-Za-z\s]+?)(?:\n|$|Gram|Panchayat)',
-        'GRAM_PANCHAYAT': r'(?:Gram\s*Panchayat|Panchayat|GP)[:\s]*([A-Za-z\s]+?)(?:\n|$|Tehsil|Block)',
-        'TEHSIL': r'(?:Tehsil|Taluka|Block)[:\s]*([A-Za-z\s]+?)(?:\n|$|District)',
-        'DISTRICT': r'(?:District|Zilla)[:\s]*([A-Za-z\s]+?)(?:\n|$|State)',
-        'STATE': r'(?:State|Pradesh)[:\s]*([A-Za-z\s]+?)(?:\n|$|Claim|Type)',
-        'CLAIM_TYPE': r'(?:Claim\s*Type|Type\s*of\s*Claim)[:\s]*(CFR|IFR|CR)',
-        'LAND_CLAIMED': r'(?:Land\s*Claimed|Area\s*Claimed|Land\s*Area)[:\s]*([\d.]+\s*(?:hectares?|acres?|ha))',
-        'LAND_USE': r'(?:Land\s*Use|Use\s*of\s*Land)[:\s]*([A-Za-z\s]+?)(?:\n|$|Annual)',
-        'ANNUAL_INCOME': r'(?:Annual\s*Income|Income)[:\s]*(?:Rs\.?\s*)?(\d+)',
-        'BOUNDARY_DESCRIPTION': r'(?:Boundary.*Description|Boundaries)[:\s]*([^:\n]+?)(?:\n|$|Geo)',
-        'GEO_COORDINATES': r'(?:Geo.*Coordinates|GPS|Lat.*Long)[:\s]*([\d.\s,\-]+)',
-        'STATUS_OF_CLAIM': r'(?:Status.*Claim|Status)[:\s]*(Pending|Approved|Rejected)',
-        'DATE_OF_SUBMISSION': r'(?:Date.*Submission|Submitted.*Date)[:\s]*([\d/\-]+)',
-        'DATE_OF_DECISION': r'(?:Date.*Decision|Decision.*Date)[:\s]*([\d/\-]+)',
-        'PATTA_TITLE_NO': r'(?:Patta.*No|Title.*No|Document.*No)[:\s]*([A-Za-z0-9]+)',
-        'WATER_BODY': r'(?:Water\s*Body|Water\s*Source)[:\s]*([A-Za-z\s]+?)(?:\n|$|Irrigation)',
-        'IRRIGATION_SOURCE': r'(?:Irrigation.*Source|Irrigation)[:\s]*([A-Za-z\s]+?)(?:\n|$|Infrastructure)',
-        'INFRASTRUCTURE_PRESENT': r'(?:Infrastructure.*Present|Infrastructure)[:\s]*([A-Za-z\s,]+?)(?:\n|$)'
-    }
+    """Extract fields using the shared regex rules"""
 
     # Extract data
     extracted_data = {}
 
-    for field, pattern in patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            value = match.group(1).strip()
+    matches = CSV_FIELD_RULES.extract(text)
+
+    for field in CSV_FIELD_RULES.fields:
+        if field in matches:
             # Clean up the value
-            value = re.sub(r'\s+', ' ', value)
-            extracted_data[field] = value
+            extracted_data[field] = collapse_whitespace(matches[field])
         else:
             # Set default values for missing fields
             if field == 'GENDER':
@@ -130,14 +139,7 @@ def save_to_csv(data, csv_file):
         return False
 
     # Ensure all required columns exist
-    required_columns = [
-        'CLAIMANT_NAME', 'SPOUSE_NAME', 'GENDER', 'AADHAAR_NO', 'CATEGORY',
-        'VILLAGE', 'GRAM_PANCHAYAT', 'TEHSIL', 'DISTRICT', 'STATE',
-        'CLAIM_TYPE', 'LAND_CLAIMED', 'LAND_USE', 'ANNUAL_INCOME',
-        'BOUNDARY_DESCRIPTION', 'GEO_COORDINATES', 'STATUS_OF_CLAIM',
-        'DATE_OF_SUBMISSION', 'DATE_OF_DECISION', 'PATTA_TITLE_NO',
-        'WATER_BODY', 'IRRIGATION_SOURCE', 'INFRASTRUCTURE_PRESENT'
-    ]
+    required_columns = REQUIRED_COLUMNS
 
     # Fill missing columns
     for col in required_columns:
@@ -157,6 +159,148 @@ def save_to_csv(data, csv_file):
         print(f"Error saving CSV: {e}")
         return False
 
+def find_images(inputs):
+    """Expand directories, files and glob patterns into a sorted list of image paths"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            paths.update(path for path in glob.glob(item, recursive=True)
+                         if path.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(os.path.abspath(path) for path in paths)
+
+def load_checkpoint(checkpoint_file):
+    """Image paths already written to the output by an earlier run"""
+    if not os.path.exists(checkpoint_file):
+        return set()
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def process_path(image_path):
+    """Batch worker: OCR and extract one image; returns (path, row or None, error)
+
+    Unlike the single-image demo there is no mock-text fallback: an OCR
+    failure is reported as an error so the image is retried on the next run.
+    """
+    try:
+        text = ocr_image(image_path)
+        if not text:
+            return image_path, None, "No text extracted"
+        row = extract_fields_from_text(text)
+        row['SOURCE_IMAGE'] = image_path
+        return image_path, row, None
+    except Exception as e:
+        return image_path, None, str(e)
+
+def init_worker():
+    """Load the OCR reader once per worker process, before any image arrives"""
+    if HAS_EASYOCR:
+        get_reader()
+
+class CsvRowWriter:
+    """Append rows to a CSV file, flushing each one (same interface as ParquetClaimWriter)"""
+
+    def __init__(self, csv_file):
+        write_header = not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+        self._file = open(csv_file, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=REQUIRED_COLUMNS + ['SOURCE_IMAGE'],
+                                      extrasaction='ignore')
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+        return True
+
+    def close(self):
+        self._file.close()
+
+def run_batch(inputs, output, checkpoint_file=None, workers=1, report_every=50,
+              output_format='csv', row_group_rows=5000):
+    """Process every image under ``inputs``, streaming one record per image to ``output``
+
+    ``output`` is a CSV file, or for ``output_format='parquet'`` a dataset
+    directory partitioned by state (see columnar_output.py).
+    """
+    if not HAS_EASYOCR:
+        print("Error: EasyOCR is not installed; batch mode would only write mock data.")
+        return 1
+
+    checkpoint_file = checkpoint_file or output.rstrip('/\\') + '.checkpoint'
+    paths = find_images(inputs)
+    done = load_checkpoint(checkpoint_file)
+    todo = [path for path in paths if path not in done]
+    print(f"Found {len(paths)} images, {len(paths) - len(todo)} already done, {len(todo)} to process")
+    if not todo:
+        return 0
+
+    processed = failed = 0
+    start = time.perf_counter()
+    if output_format == 'parquet':
+        writer = ParquetClaimWriter(output, batch_rows=row_group_rows)
+    else:
+        writer = CsvRowWriter(output)
+    unflushed = []  # images whose records are not on disk yet
+
+    def commit_checkpoint():
+        checkpoint.write(''.join(path + '\n' for path in unflushed))
+        checkpoint.flush()
+        unflushed.clear()
+
+    with open(checkpoint_file, 'a', encoding='utf-8') as checkpoint:
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=init_worker)
+            results = pool.imap_unordered(process_path, todo, chunksize=4)
+        else:
+            pool = None
+            init_worker()
+            results = map(process_path, todo)
+
+        try:
+            for image_path, row, error in results:
+                if row is None:
+                    # Not checkpointed, so it is retried on the next run
+                    failed += 1
+                    print(f"Failed {image_path}: {error}")
+                else:
+                    # Record first, then checkpoint: a crash in between re-processes, never loses
+                    unflushed.append(image_path)
+                    if writer.write(row):
+                        commit_checkpoint()
+                    processed += 1
+
+                finished = processed + failed
+                if finished % report_every == 0 or finished == len(todo):
+                    elapsed = time.perf_counter() - start
+                    rate = finished / elapsed if elapsed else 0.0
+                    eta = (len(todo) - finished) / rate if rate else 0.0
+                    print(f"[{finished}/{len(todo)}] {rate:.2f} images/s, ETA {eta:.0f}s")
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            writer.close()
+            commit_checkpoint()
+
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "images": len(todo),
+        "processed": processed,
+        "failed": failed,
+        "skipped": len(paths) - len(todo),
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "images_per_second": round((processed + failed) / elapsed, 3) if elapsed else 0.0,
+        "output": output
+    }, indent=2))
+    return 0 if failed == 0 else 2
+
 def main():
     """Main pipeline function"""
     print("Starting OCR pipeline...")
@@ -188,4 +332,21 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', help='Image files, directories or glob patterns (batch mode)')
+    parser.add_argument('--output', default=OUTPUT_CSV,
+                        help='CSV to append rows to, or the dataset directory for --format parquet')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='parquet writes typed, state-partitioned row groups (needs pyarrow)')
+    parser.add_argument('--row-group-rows', type=int, default=5000,
+                        help='Records buffered per Parquet row group flush')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Worker processes, each with its own OCR reader')
+    parser.add_argument('--report-every', type=int, default=50, help='Print throughput every N images')
+    args = parser.parse_args()
+
+    if not args.inputs:
+        sys.exit(main())
+    sys.exit(run_batch(args.inputs, args.output, args.checkpoint, args.workers, args.report_every,
+                       args.format, args.row_group_rows))
\ No newline at end of file
@@ -1,45 +1,172 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from werkzeug.utils import secure_filename
 import spacy
 import easyocr
+import cv2
+import numpy as np
 import os
 import json
-import re
-import tempfile
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
+# Shared OCR text rules live with the extraction pipeline scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Faker', 'pipeline'))
+
+from extraction_cache import ExtractionCache
+from extraction_rules import BOUNDARY_SIDES, FORM_FIELD_RULES, extract_boundaries, normalize_ocr_text
+from form_templates import TEMPLATES, recognize_template_fields
+from pdf_pages import HAS_PDFIUM, is_pdf, iter_pdf_pages
+from image_preprocessing import load_config as load_preprocess_config, preprocess_image
+from job_queue import JobQueue, QueueFullError
+from micro_batcher import MicroBatcher
+from metrics import Registry, configure_logging, process_rss_bytes
+
 app = Flask(__name__)
 
+# LOG_FORMAT=json emits one JSON object per log line
+configure_logging(os.environ.get('LOG_LEVEL', 'INFO'), os.environ.get('LOG_FORMAT', 'text'))
+logger = logging.getLogger('ai_service')
+
 # Configuration
-UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH_MB', 16)) * 1024 * 1024  # 16MB max upload by default
+
+# Batch processing
+OCR_BATCH_SIZE = int(os.environ.get('OCR_BATCH_SIZE', 8))  # text crops per EasyOCR recognizer batch
+NLP_BATCH_SIZE = int(os.environ.get('NLP_BATCH_SIZE', 32))  # documents per spaCy nlp.pipe batch
+MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', 200))
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', 16))  # images decoded at once per batch request
+
+# Pre-OCR normalization (resolution cap, deskew, binarization); see image_preprocessing.py
+PREPROCESS_CONFIG = load_preprocess_config()
+
+# Region-of-interest OCR for known form layouts (see form_templates.py)
+TEMPLATE_OCR = os.environ.get('TEMPLATE_OCR', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+# Multi-page PDF bundles: pages are rasterized one at a time and OCR'd in parallel
+PDF_RENDER_DPI = int(os.environ.get('PDF_RENDER_DPI', 200))
+PDF_PAGE_WORKERS = int(os.environ.get('PDF_PAGE_WORKERS', os.cpu_count() or 2))
+PDF_MAX_MEMORY_MB = int(os.environ.get('PDF_MAX_MEMORY_MB', 256))  # cap on rasterized pages held at once
 
 # Paths for models
 FAKER_PIPELINE_PATH = os.path.join(os.path.dirname(__file__), '..', 'Faker', 'pipeline')
 MODEL_PATH = os.path.join(FAKER_PIPELINE_PATH, "model-best", "content", "model-best")
 
+# Extraction result cache (set EXTRACTION_CACHE_DIR to also persist results on disk)
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get('EXTRACTION_CACHE_MAX_ENTRIES', 1024))
+EXTRACTION_CACHE_MAX_MB = int(os.environ.get('EXTRACTION_CACHE_MAX_MB', 64))
+EXTRACTION_CACHE_DIR = os.environ.get('EXTRACTION_CACHE_DIR')
+EXTRACTION_CACHE_DISK_MAX_MB = int(os.environ.get('EXTRACTION_CACHE_DISK_MAX_MB', 512))
+
+# Asynchronous job API: fixed OCR worker pool behind a bounded queue
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 32))
+JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 600))  # seconds finished jobs stay pollable
+
+# Lean NER inference: load only the components the NER pipe needs
+NER_LEAN = os.environ.get('NER_LEAN', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+# Cross-request micro-batching of OCR and NER calls (MICRO_BATCH_WINDOW_MS=0 disables)
+MICRO_BATCH_WINDOW_MS = int(os.environ.get('MICRO_BATCH_WINDOW_MS', 10))  # max wait added to a lone request
+MICRO_BATCH_MAX = int(os.environ.get('MICRO_BATCH_MAX', 8))
+MICRO_BATCH_TIMEOUT = float(os.environ.get('MICRO_BATCH_TIMEOUT', 300))  # seconds a request waits for its batch
+
+# OCR+NER in worker processes, each with its own models (OCR_PROCESSES=0 keeps them in this process)
+OCR_PROCESSES = int(os.environ.get('OCR_PROCESSES', 0))
+OCR_PROCESS_THREADS = int(os.environ.get(
+    'OCR_PROCESS_THREADS', max(1, (os.cpu_count() or 1) // max(1, OCR_PROCESSES))))  # torch threads per worker
+
 # Global variables for models
 nlp = None
 reader = None
+reader_lock = threading.Lock()  # OCR workers may race to load the reader
+ocr_pool = None
+ocr_pool_lock = threading.Lock()
+in_ocr_process = False  # True inside an OCR pool worker
+ocr_ready = None  # shared [spaCy, EasyOCR] counts of OCR pool workers that loaded each model
+
+extraction_cache = ExtractionCache(
+    MODEL_PATH,
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+    max_bytes=EXTRACTION_CACHE_MAX_MB * 1024 * 1024,
+    cache_dir=EXTRACTION_CACHE_DIR,
+    max_disk_bytes=EXTRACTION_CACHE_DISK_MAX_MB * 1024 * 1024,
+    settings={"preprocessing": PREPROCESS_CONFIG, "template_ocr": TEMPLATE_OCR}
+)
+
+# Metrics served on /metrics (Prometheus text format)
+METRICS = Registry()
+REQUEST_SECONDS = METRICS.histogram(
+    'ai_service_request_seconds', 'Total time to handle an HTTP request', ['endpoint'])
+STAGE_SECONDS = METRICS.histogram(
+    'ai_service_stage_seconds', 'Per-document time spent in each processing stage', ['stage'])
+DOCUMENTS = METRICS.counter(
+    'ai_service_documents_total', 'Documents processed, by outcome', ['outcome'])
+BATCH_SIZE = METRICS.histogram(
+    'ai_service_micro_batch_size', 'Requests served by one batched inference call', ['stage'],
+    buckets=(1, 2, 4, 8, 16, 32, 64))
+FALLBACKS = METRICS.counter(
+    'ai_service_fallbacks_total', 'Documents that fell back to a slower or weaker extraction path', ['kind'])
+METRICS.gauge('ai_service_job_queue_depth', 'Jobs waiting for an OCR worker', lambda: job_queue.depth())
+METRICS.gauge('ai_service_spacy_model_loaded', '1 if the spaCy NER model is loaded', lambda: models_loaded()[0])
+METRICS.gauge('ai_service_easyocr_loaded', '1 if the EasyOCR reader is loaded', lambda: models_loaded()[1])
+METRICS.gauge('process_resident_memory_bytes', 'Resident memory of the service process', process_rss_bytes)
+
+def lean_exclusions(model_path):
+    """Pipeline components NER inference does not need
+
+    Keeps ``ner`` and, when its embedding layer listens to a shared
+    tok2vec/transformer component, that upstream component too.
+    """
+    try:
+        config = spacy.util.load_config(Path(model_path) / "config.cfg")
+    except Exception as e:
+        logger.warning("Could not read model config, loading full pipeline: %s", e)
+        return []
+
+    pipeline = list(config["nlp"]["pipeline"])
+    if 'ner' not in pipeline:
+        return []
+
+    keep = {'ner'}
+    ner_tok2vec = config["components"]["ner"].get("model", {}).get("tok2vec", {})
+    if "Listener" in str(ner_tok2vec.get("@architectures", "")):
+        upstream = ner_tok2vec.get("upstream", "*")
+        if upstream == "*":
+            keep.update(
+                name for name in pipeline
+                if config["components"][name].get("factory") in ("tok2vec", "transformer")
+            )
+        else:
+            keep.add(upstream)
+    return [name for name in pipeline if name not in keep]
 
 def load_spacy_model():
     """Load only the spaCy NER model at startup"""
-    global nlp
+    global nlp, LABEL_TO_FIELD
     try:
-        print("Loading spaCy NER model...")
+        logger.info("Loading spaCy NER model", extra={"model_path": MODEL_PATH})
         if os.path.exists(MODEL_PATH):
-            nlp = spacy.load(MODEL_PATH)
-            print("✓ spaCy model loaded successfully")
-            print(f"Model labels: {nlp.get_pipe('ner').labels}")
+            exclude = lean_exclusions(MODEL_PATH) if NER_LEAN else []
+            nlp = spacy.load(MODEL_PATH, exclude=exclude)
+            labels = nlp.get_pipe('ner').labels
+            LABEL_TO_FIELD = build_label_index(labels)
+            logger.info("spaCy model loaded", extra={"pipeline": nlp.pipe_names, "excluded": exclude})
+            logger.info("Model labels: %s", labels)
+            logger.debug("Label to field index: %s", LABEL_TO_FIELD)
             return True
         else:
-            print("⚠ spaCy model not found, will use regex fallback")
+            logger.warning("spaCy model not found, will use regex fallback")
             nlp = None
             return True
     except Exception as e:
-        print(f"Error loading spaCy model: {e}")
+        logger.error("Error loading spaCy model: %s", e)
         nlp = None
         return True  # Continue even if spaCy fails
 
@@ -47,200 +174,351 @@ def load_easyocr():
     """Load EasyOCR reader when needed"""
     global reader
     if reader is None:
-        try:
-            print("Loading EasyOCR reader...")
-            reader = easyocr.Reader(['en'])
-            print("✓ EasyOCR reader loaded successfully")
-        except Exception as e:
-            print(f"Error loading EasyOCR: {e}")
-            reader = None
+        with reader_lock:
+            if reader is None:
+                try:
+                    logger.info("Loading EasyOCR reader")
+                    reader = easyocr.Reader(['en'])
+                    logger.info("EasyOCR reader loaded")
+                except Exception as e:
+                    logger.error("Error loading EasyOCR: %s", e)
+                    reader = None
     return reader is not None
 
+def check_model_changed():
+    """Invalidate cached extractions and reload spaCy when the model on disk changes
+
+    With OCR_PROCESSES the HTTP process only invalidates its cache: NER runs in
+    the workers, which each notice the change and reload their own model.
+    """
+    if extraction_cache.check_model():
+        if OCR_PROCESSES > 0 and not in_ocr_process:
+            logger.info("spaCy model changed on disk, cache invalidated; OCR workers reload it")
+            return
+        logger.info("spaCy model changed on disk, cache invalidated; reloading model")
+        load_spacy_model()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_image(image_path):
-    """Extract text from image using EasyOCR"""
+def decode_image(data):
+    """Decode uploaded image bytes into a BGR NumPy array, entirely in memory"""
+    if not data:
+        return None
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+def extract_text_from_image(image):
+    """Extract text from an image array using EasyOCR"""
     try:
         # Load EasyOCR if not already loaded
         if not load_easyocr():
-            print("Failed to load EasyOCR")
+            logger.error("Failed to load EasyOCR")
             return None
             
-        result = reader.readtext(image_path, detail=0)
+        with STAGE_SECONDS.time(stage='ocr'):
+            result = reader.readtext(image, detail=0)
         return "\n".join(result)
     except Exception as e:
-        print(f"OCR Error: {e}")
+        logger.error("OCR error: %s", e)
         return None
 
+def extract_texts_from_images(images):
+    """Extract text from several image arrays, batching EasyOCR work across them
+
+    Images with identical dimensions (the normal case for scanned forms) are
+    sent through ``readtext_batched`` together so detection and recognition run
+    batched. Returns one joined text (or None on failure) per input image, in order.
+    """
+    texts = [None] * len(images)
+    if not load_easyocr():
+        logger.error("Failed to load EasyOCR")
+        return texts
+
+    # Group images by shape; readtext_batched stacks images for the detector
+    groups = {}
+    for index, image in enumerate(images):
+        if image is None:
+            continue
+        groups.setdefault(image.shape, []).append((index, image))
+
+    for members in groups.values():
+        indices = [index for index, _ in members]
+        images = [image for _, image in members]
+        try:
+            start = time.perf_counter()
+            if len(images) == 1:
+                results = [reader.readtext(images[0], detail=0, batch_size=OCR_BATCH_SIZE)]
+            else:
+                results = reader.readtext_batched(images, detail=0, batch_size=OCR_BATCH_SIZE)
+            per_image = (time.perf_counter() - start) / len(images)
+            for index, result in zip(indices, results):
+                texts[index] = "\n".join(result)
+                STAGE_SECONDS.observe(per_image, stage='ocr')
+        except Exception as e:
+            logger.error("Batched OCR error: %s", e)
+
+    return texts
+
+def format_boundaries(boundaries):
+    """One boundary_description value from boundaries read as North, South, East, West"""
+    return ", ".join(f"{side}: {value}" for side, value in zip(BOUNDARY_SIDES, boundaries))
+
+def template_fields_to_schema(fields):
+    """Template fields under the names and formats the full-page path returns
+
+    Only FIELD_MAPPING fields are kept, so /process returns the same keys
+    whichever path read the document; the boundary text is normalized like the
+    regex path's.
+    """
+    data = {field: value for field, value in fields.items()
+            if field in FIELD_MAPPING and field != 'boundary_description'}
+    boundaries = extract_boundaries(fields.get('boundary_description', ''))
+    if boundaries:
+        data['boundary_description'] = format_boundaries(boundaries)
+    return data
+
+def extract_fields_with_template(image):
+    """Try each known form template; returns (template_name, fields) or None
+
+    Only the value boxes of a matching template are recognised, which skips
+    full-page text detection and regex field guessing entirely.
+    """
+    if not TEMPLATE_OCR or not load_easyocr():
+        return None
+
+    with STAGE_SECONDS.time(stage='template_ocr'):
+        for template_name in TEMPLATES:
+            try:
+                fields = recognize_template_fields(reader, image, template_name, batch_size=OCR_BATCH_SIZE)
+            except Exception as e:
+                logger.error("Template OCR error (%s): %s", template_name, e)
+                continue
+            if fields:
+                logger.info("Matched form template", extra={"template": template_name, "fields": len(fields)})
+                return template_name, template_fields_to_schema(fields)
+
+    FALLBACKS.inc(kind='full_page_ocr')
+    return None
+
 def preprocess_ocr_text(text):
-    """Clean and preprocess OCR text using the same logic as your pipeline"""
-    if not text:
-        return ""
-    
-    # Basic cleaning
-    text = re.sub(r'\n+', '\n', text)
-    text = re.sub(r'[ ]{2,}', ' ', text)
-    text = re.sub(r'(Age|Gender|Aadhaar No):\s*\n\s*(\S+)', r'\1: \2', text, flags=re.IGNORECASE)
-
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    merged_lines = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if line.endswith(':') and i + 1 < len(lines):
-            next_line = lines[i + 1]
-            if not next_line.endswith(':'):
-                line = f"{line} {next_line}"
-                i += 1
-        merged_lines.append(line)
-        i += 1
-
-    text = ' '.join(merged_lines)
-
-    # Common OCR corrections from your pipeline
-    corrections = {
-        r'\b0fficer\b': 'Officer',
-        r'\bBorewe11\b': 'Borewell',
-        r'\bJa1\b': 'Jal',
-        r'\bC1aimant\b': 'Claimant',
-        r'\bC1aim\b': 'Claim',
-        r'\bVi11age\b': 'Village',
-        r'\bDistr1ct\b': 'District',
-        r'\bState\b': 'State',
-        r'\bPatt1\b': 'Patta',
-        r'\bAadhaar\b': 'Aadhaar',
-        r'\bTehs1l\b': 'Tehsil',
-        r'\bPanchayat\b': 'Panchayat',
-        r'\bTehsi1\b': 'Tehsil',
-        r'\bIs1and\b': 'Island',
-        r'\bE11is\b': 'Ellis',
-        r'\bB1ake\b': 'Blake',
-        r'\bRache1\b': 'Rachel',
-        r'Lsngcirg': ''
-    }
-    
-    for pattern, repl in corrections.items():
-        text = re.sub(pattern, repl, text)
+    """Clean and preprocess OCR text with the shared pipeline rules"""
+    return normalize_ocr_text(text)
 
-    # Remove text after "Claimant Signature"
-    text = re.split(r'Claimant Signature', text, flags=re.IGNORECASE)[0]
-    
-    return text
+# Map spaCy labels to our field names
+FIELD_MAPPING = {
+    'claimant_name': ['claimant', 'name', 'person'],
+    'spouse_name': ['spouse', 'father', 'husband'],
+    'village': ['village', 'gram'],
+    'gram_panchayat': ['panchayat'],
+    'tehsil': ['tehsil', 'block'],
+    'district': ['district'],
+    'state': ['state'],
+    'patta_title_no': ['patta', 'title', 'khasra'],
+    'aadhaar_no': ['aadhaar', 'adhar'],
+    'land_claimed': ['area', 'land', 'hectare', 'acre'],
+    'category': ['category', 'caste'],
+    'claim_type': ['claim', 'type'],
+    'land_use': ['use', 'purpose'],
+    'annual_income': ['income', 'annual'],
+    'tax_payer': ['tax', 'payer'],
+    'boundary_description': ['boundary', 'north', 'south', 'east', 'west'],
+    'geo_coordinates': ['coordinate', 'latitude', 'longitude'],
+    'status_of_claim': ['status', 'approved', 'rejected', 'pending'],
+    'water_body': ['water', 'pond', 'river', 'well'],
+    'irrigation_source': ['irrigation', 'canal', 'well'],
+    'infrastructure_present': ['infrastructure', 'road', 'school', 'hospital']
+}
+
+# Model label -> field, resolved once when the model is loaded
+LABEL_TO_FIELD = {}
+
+def resolve_label(label):
+    """Pick the field a model label belongs to
+
+    A label named exactly like a field wins; otherwise the field with the most
+    keywords contained in the label (earliest in FIELD_MAPPING on ties).
+    Labels matching no keyword keep their own lowercased name.
+    """
+    name = label.lower()
+    if name in FIELD_MAPPING:
+        return name
+    best_field, best_score = name, 0
+    for field, keywords in FIELD_MAPPING.items():
+        score = sum(1 for keyword in keywords if keyword in name)
+        if score > best_score:
+            best_field, best_score = field, score
+    return best_field
+
+def build_label_index(labels):
+    """Lookup table from every NER label to its target field"""
+    return {label: resolve_label(label) for label in labels}
+
+def entities_from_doc(doc):
+    """Collect field values from the entities of a processed spaCy doc"""
+    entities = {}
+
+    logger.debug("Found %d entities", len(doc.ents))
+
+    for ent in doc.ents:
+        field = LABEL_TO_FIELD.get(ent.label_) or resolve_label(ent.label_)
+        value = ent.text.strip().replace('\n', ' ')
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Entity: %s -> %s (%s)", ent.label_, value, field)
+
+        if field not in entities or len(value) > len(entities[field]):
+            entities[field] = value
+
+    return entities
 
 def extract_entities_with_spacy(text):
     """Extract entities using the trained spaCy NER model"""
-    if not text or not nlp:
+    if not text:
+        return {}
+    if not nlp:
+        FALLBACKS.inc(kind='regex_only')
         return {}
     
     try:
-        doc = nlp(text)
-        entities = {}
-        
-        print(f"Processing text with spaCy model...")
-        print(f"Found {len(doc.ents)} entities")
-        
-        for ent in doc.ents:
-            label = ent.label_.lower()
-            value = ent.text.strip().replace('\n', ' ')
-            
-            print(f"Entity: {label} -> {value}")
-            
-            # Map spaCy labels to our field names
-            field_mapping = {
-                'claimant_name': ['claimant', 'name', 'person'],
-                'spouse_name': ['spouse', 'father', 'husband'],
-                'village': ['village', 'gram'],
-                'district': ['district'],
-                'state': ['state'],
-                'patta_title_no': ['patta', 'title', 'khasra'],
-                'aadhaar_no': ['aadhaar', 'adhar'],
-                'land_claimed': ['area', 'land', 'hectare', 'acre'],
-                'category': ['category', 'caste'],
-                'claim_type': ['claim', 'type'],
-                'land_use': ['use', 'purpose'],
-                'annual_income': ['income', 'annual'],
-                'tax_payer': ['tax', 'payer'],
-                'boundary_description': ['boundary', 'north', 'south', 'east', 'west'],
-                'geo_coordinates': ['coordinate', 'latitude', 'longitude'],
-                'status_of_claim': ['status', 'approved', 'rejected', 'pending'],
-                'water_body': ['water', 'pond', 'river', 'well'],
-                'irrigation_source': ['irrigation', 'canal', 'well'],
-                'infrastructure_present': ['infrastructure', 'road', 'school', 'hospital']
-            }
-            
-            for field, labels in field_mapping.items():
-                if any(label in label.lower() for label in labels):
-                    if field not in entities or len(value) > len(entities[field]):
-                        entities[field] = value
-                    break
-        
-        print(f"Extracted entities: {entities}")
+        with STAGE_SECONDS.time(stage='ner'):
+            entities = entities_from_doc(nlp(text))
+        logger.debug("Extracted entities: %s", entities)
         return entities
     except Exception as e:
-        print(f"spaCy processing error: {e}")
+        logger.error("spaCy processing error: %s", e)
+        FALLBACKS.inc(kind='regex_only')
         return {}
 
+def extract_entities_batch(texts):
+    """Extract entities for many texts with a single spaCy ``nlp.pipe`` pass"""
+    if not texts:
+        return []
+    if not nlp:
+        FALLBACKS.inc(len(texts), kind='regex_only')
+        return [{} for _ in texts]
+
+    try:
+        logger.debug("Processing %d texts with spaCy model", len(texts))
+        start = time.perf_counter()
+        entities = [entities_from_doc(doc) for doc in nlp.pipe(texts, batch_size=NLP_BATCH_SIZE)]
+        per_text = (time.perf_counter() - start) / len(texts)
+        for _ in texts:
+            STAGE_SECONDS.observe(per_text, stage='ner')
+        return entities
+    except Exception as e:
+        logger.error("spaCy batch processing error: %s", e)
+        FALLBACKS.inc(len(texts), kind='regex_only')
+        return [{} for _ in texts]
+
 def extract_fields_with_regex(text):
-    """Extract fields using regex patterns from your process_image_simple.py"""
+    """Extract fields with the shared compiled FRA form rules"""
     if not text:
         return {}
 
-    data = {}
-
-    # Enhanced patterns for FRA forms (from your script)
-    patterns = {
-        'claimant_name': r"(?:Name|Claimant|नाम)[:\s]*([A-Za-z\s]+?)(?:\n|$|Father|Husband)",
-        'spouse_name': r"(?:Father|Husband|पिता|पति)[:\s]*(?:Name|नाम)?[:\s]*([A-Za-z\s]+?)(?:\n|$)",
-        'village': r"(?:Village|गांव|ग्राम)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'gram_panchayat': r"(?:Panchayat|पंचायत|Gram\s*Panchayat)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'tehsil': r"(?:Tehsil|Block|तहसील|ब्लॉक)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'district': r"(?:District|जिला)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'state': r"(?:State|राज्य)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
-        'land_claimed': r"(?:Area|Land\s*Area|क्षेत्र)[:\s]*([0-9.]+\s*(?:hectare|acre|हेक्टेयर|एकड़)?)",
-        'patta_title_no': r"(?:Khasra|Patta|खसरा|पट्टा)[:\s]*(?:No|Number|संख्या)?[:\s]*([A-Za-z0-9/\-]+)",
-        'aadhaar_no': r"(?:Aadhaar|Adhar|आधार)[:\s]*(?:No|Number|संख्या)?[:\s]*([0-9\s]+)",
-        'category': r"(?:Category|Caste|श्रेणी|जाति)[:\s]*([A-Za-z0-9\s]+)",
-        'claim_type': r"(?:Claim\s*Type|Type\s*of\s*Claim|दावे का प्रकार)[:\s]*([A-Za-z\s]+)",
-        'land_use': r"(?:Land\s*Use|Use\s*of\s*Land|भूमि का उपयोग)[:\s]*([A-Za-z\s]+)",
-        'annual_income': r"(?:Annual\s*Income|Income|वार्षिक आय)[:\s]*([0-9,]+)",
-        'tax_payer': r"(?:Tax\s*Payer|Taxpayer|करदाता)[:\s]*(Yes|No|हाँ|नहीं)",
-        'status_of_claim': r"(?:Status|Status\s*of\s*Claim|स्थिति)[:\s]*(Approved|Rejected|Pending|मंजूर|अस्वीकृत|लंबित)",
+    with STAGE_SECONDS.time(stage='regex'):
+        data = FORM_FIELD_RULES.extract(text)
+
+        boundaries = extract_boundaries(text)
+        if boundaries:
+            data['boundary_description'] = format_boundaries(boundaries)
+
+    return data
+
+UNDECODABLE_RESULT = {
+    "success": False,
+    "error": "Could not decode uploaded file as an image",
+    "extracted_data": {}
+}
+
+def build_result(raw_text, processed_text, spacy_entities):
+    """Merge spaCy and regex extractions into the response payload for one document"""
+    # Extract fields using regex patterns from your script
+    regex_entities = extract_fields_with_regex(processed_text)
+
+    # Combine results (spaCy takes priority, but regex fills gaps)
+    final_data = {**regex_entities, **spacy_entities}
+
+    # Clean up the data
+    cleaned_data = {}
+    for key, value in final_data.items():
+        if value and str(value).strip():
+            cleaned_data[key] = str(value).strip()
+
+    logger.debug("Extracted fields", extra={
+        "regex_fields": len(regex_entities),
+        "spacy_fields": len(spacy_entities),
+        "fields": sorted(cleaned_data)
+    })
+
+    return {
+        "success": True,
+        "extracted_data": cleaned_data,
+        "raw_text": raw_text[:1000] + "..." if len(raw_text) > 1000 else raw_text,
+        "method": "spacy_ner_with_regex"
     }
 
-    for field, pattern in patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            data[field] = match.group(1).strip()
+def build_template_result(template_name, fields):
+    """Response payload for a document read through a layout template"""
+    cleaned_data = {key: str(value).strip() for key, value in fields.items() if str(value).strip()}
+    return {
+        "success": True,
+        "extracted_data": cleaned_data,
+        "raw_text": "\n".join(f"{key}: {value}" for key, value in cleaned_data.items()),
+        "method": "template_roi",
+        "template": template_name
+    }
 
-    # Extract boundaries
-    boundary_pattern = r"(?:North|South|East|West|उत्तर|दक्षिण|पूर्व|पश्चिम)[:\s]*([A-Za-z\s,]+?)(?:\n|$)"
-    boundaries = re.findall(boundary_pattern, text, re.IGNORECASE | re.MULTILINE)
+# Batchers gather calls from concurrent requests into batches; OCR runs as many
+# batches at once as there are OCR workers, so one slow batch does not serialize the rest
+ocr_batcher = MicroBatcher(
+    extract_texts_from_images, max_batch=MICRO_BATCH_MAX, max_wait=MICRO_BATCH_WINDOW_MS / 1000.0,
+    name="ocr-batcher", on_batch=lambda size: BATCH_SIZE.observe(size, stage='ocr'), dispatchers=OCR_WORKERS)
+ner_batcher = MicroBatcher(
+    extract_entities_batch, max_batch=MICRO_BATCH_MAX * 4, max_wait=MICRO_BATCH_WINDOW_MS / 1000.0,
+    name="ner-batcher", on_batch=lambda size: BATCH_SIZE.observe(size, stage='ner'))
 
-    if boundaries:
-        boundary_desc = []
-        if len(boundaries) > 0:
-            boundary_desc.append(f"North: {boundaries[0].strip()}")
-        if len(boundaries) > 1:
-            boundary_desc.append(f"South: {boundaries[1].strip()}")
-        if len(boundaries) > 2:
-            boundary_desc.append(f"East: {boundaries[2].strip()}")
-        if len(boundaries) > 3:
-            boundary_desc.append(f"West: {boundaries[3].strip()}")
-        
-        if boundary_desc:
-            data['boundary_description'] = ", ".join(boundary_desc)
+def recognize_text(image):
+    """Full-page OCR for one image, batched with concurrent requests when enabled"""
+    if MICRO_BATCH_WINDOW_MS <= 0:
+        return extract_text_from_image(image)
+    return ocr_batcher.submit(image, timeout=MICRO_BATCH_TIMEOUT)
 
-    return data
+def recognize_entities(text):
+    """spaCy NER for one text, batched with concurrent requests when enabled"""
+    if MICRO_BATCH_WINDOW_MS <= 0 or not text:
+        return extract_entities_with_spacy(text)
+    return ner_batcher.submit(text, timeout=MICRO_BATCH_TIMEOUT)
+
+def normalize_image(image):
+    """Run pre-OCR normalization and record its cost"""
+    image, preprocessing = preprocess_image(image, PREPROCESS_CONFIG)
+    STAGE_SECONDS.observe(preprocessing.get('total_ms', 0) / 1000.0, stage='preprocess')
+    return image, preprocessing
+
+def record_outcome(result):
+    """Count a processed document as a success or failure"""
+    DOCUMENTS.inc(outcome='success' if result.get("success") else 'failure')
+    return result
 
-def process_document(file_path):
-    """Main function to process a document and extract data"""
+def process_document(image):
+    """Main function to process a decoded document image and extract data"""
     try:
-        print(f"Processing file: {file_path}")
+        logger.debug("Processing image", extra={"width": image.shape[1], "height": image.shape[0]})
+
+        # Normalize resolution, skew and contrast before OCR
+        image, preprocessing = normalize_image(image)
+
+        # Known form layouts: recognise only the value regions
+        template_match = extract_fields_with_template(image)
+        if template_match:
+            result = build_template_result(*template_match)
+            result["preprocessing"] = preprocessing
+            return result
         
         # Extract text using OCR
-        raw_text = extract_text_from_image(file_path)
+        raw_text = recognize_text(image)
         
         if not raw_text:
             return {
@@ -249,58 +527,325 @@ def process_document(file_path):
                 "extracted_data": {}
             }
         
-        print(f"Extracted text length: {len(raw_text)} characters")
-        print(f"Raw text preview: {raw_text[:200]}...")
-        
         # Preprocess text using your pipeline logic
         processed_text = preprocess_ocr_text(raw_text)
-        print(f"Processed text length: {len(processed_text)} characters")
-        print(f"Processed text preview: {processed_text[:200]}...")
+        logger.debug("OCR text", extra={"raw_chars": len(raw_text), "processed_chars": len(processed_text)})
         
         # Extract entities using spaCy NER model (if available)
-        spacy_entities = extract_entities_with_spacy(processed_text)
-        print(f"spaCy extracted {len(spacy_entities)} entities")
+        spacy_entities = recognize_entities(processed_text)
         
-        # Extract fields using regex patterns from your script
-        regex_entities = extract_fields_with_regex(processed_text)
-        print(f"Regex extracted {len(regex_entities)} entities")
-        
-        # Combine results (spaCy takes priority, but regex fills gaps)
-        final_data = {**regex_entities, **spacy_entities}
-        
-        # Clean up the data
-        cleaned_data = {}
-        for key, value in final_data.items():
-            if value and str(value).strip():
-                cleaned_data[key] = str(value).strip()
-        
-        print(f"Final extracted data: {len(cleaned_data)} fields")
-        print(f"Extracted fields: {list(cleaned_data.keys())}")
+        result = build_result(raw_text, processed_text, spacy_entities)
+        result["preprocessing"] = preprocessing
+        return result
         
+    except Exception as e:
+        logger.exception("Processing error: %s", e)
         return {
-            "success": True,
-            "extracted_data": cleaned_data,
-            "raw_text": raw_text[:1000] + "..." if len(raw_text) > 1000 else raw_text,
-            "method": "spacy_ner_with_regex"
+            "success": False,
+            "error": str(e),
+            "extracted_data": {}
         }
-        
+
+def process_documents(images):
+    """Process several decoded images together: batched OCR, then one nlp.pipe pass
+
+    Returns one result dict per input image, in input order.
+    """
+    results = [None] * len(images)
+    try:
+        logger.debug("Processing batch of %d images", len(images))
+
+        preprocessing = [None] * len(images)
+        ocr_images = list(images)
+        for index, image in enumerate(images):
+            if image is not None:
+                ocr_images[index], preprocessing[index] = normalize_image(image)
+
+        # Documents matching a known template skip full-page OCR
+        for index, image in enumerate(ocr_images):
+            if image is None:
+                continue
+            template_match = extract_fields_with_template(image)
+            if template_match:
+                results[index] = build_template_result(*template_match)
+                results[index]["preprocessing"] = preprocessing[index]
+                ocr_images[index] = None
+
+        raw_texts = extract_texts_from_images(ocr_images)
+
+        # Only documents with OCR text go through NER
+        ok_indices = []
+        processed_texts = []
+        for index, raw_text in enumerate(raw_texts):
+            if results[index] is not None:
+                continue
+            if images[index] is None:
+                results[index] = dict(UNDECODABLE_RESULT)
+                continue
+            if not raw_text:
+                results[index] = {
+                    "success": False,
+                    "error": "Could not extract text from image",
+                    "extracted_data": {}
+                }
+                continue
+            ok_indices.append(index)
+            processed_texts.append(preprocess_ocr_text(raw_text))
+
+        spacy_results = extract_entities_batch(processed_texts)
+
+        for index, processed_text, spacy_entities in zip(ok_indices, processed_texts, spacy_results):
+            try:
+                results[index] = build_result(raw_texts[index], processed_text, spacy_entities)
+                results[index]["preprocessing"] = preprocessing[index]
+            except Exception as e:
+                results[index] = {"success": False, "error": str(e), "extracted_data": {}}
+
+        return results
+
     except Exception as e:
-        print(f"Processing error: {e}")
+        logger.exception("Batch processing error: %s", e)
+        return [
+            result or {"success": False, "error": str(e), "extracted_data": {}}
+            for result in results
+        ]
+
+def process_pdf_page(page_number, image):
+    """OCR one rasterized PDF page; runs on the page worker pool"""
+    timings = {"page": page_number}
+    start = time.perf_counter()
+    image, preprocessing = normalize_image(image)
+    timings["preprocess_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    start = time.perf_counter()
+    template_match = extract_fields_with_template(image)
+    if template_match:
+        timings["ocr_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        timings["method"] = "template_roi"
+        return {"page": page_number, "template_fields": template_match[1], "timings": timings}
+
+    raw_text = recognize_text(image)
+    timings["ocr_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    timings["method"] = "full_page"
+    return {"page": page_number, "raw_text": raw_text or "", "timings": timings}
+
+def process_pdf(data):
+    """Process a multi-page PDF held in memory
+
+    Pages are rendered lazily and OCR'd on a pool of PDF_PAGE_WORKERS threads.
+    Full-page OCR goes through the OCR micro-batcher on purpose: a bundle's
+    pages usually share one size, so pages in flight together run as a single
+    batched readtext call (MICRO_BATCH_WINDOW_MS=0 OCRs each page directly).
+    No more pages are rasterized ahead than fit in PDF_MAX_MEMORY_MB. Page
+    texts are joined in page order for NER and regex extraction, and fields
+    read through a layout template fill in anything those miss.
+    """
+    if not HAS_PDFIUM:
         return {
             "success": False,
-            "error": str(e),
+            "error": "PDF support is not installed on the server (pip install pypdfium2)",
             "extracted_data": {}
         }
 
+    start = time.perf_counter()
+    max_bytes = PDF_MAX_MEMORY_MB * 1024 * 1024
+    pages = []
+    try:
+        with ThreadPoolExecutor(max_workers=PDF_PAGE_WORKERS) as pool:
+            in_flight = {}  # future -> (raster bytes, render ms)
+
+            def collect(futures):
+                for future in futures:
+                    _, render_ms = in_flight.pop(future)
+                    page = future.result()
+                    page["timings"]["render_ms"] = render_ms
+                    pages.append(page)
+
+            page_start = time.perf_counter()
+            for page_number, image in iter_pdf_pages(data, PDF_RENDER_DPI, max_bytes):
+                render_ms = round((time.perf_counter() - page_start) * 1000, 2)
+                future = pool.submit(process_pdf_page, page_number, image)
+                in_flight[future] = (image.nbytes, render_ms)
+                del image
+
+                # Backpressure on the renderer: stay under the memory cap
+                while in_flight and (len(in_flight) >= PDF_PAGE_WORKERS * 2
+                                     or sum(size for size, _ in in_flight.values()) >= max_bytes):
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(done)
+                page_start = time.perf_counter()
+
+            collect(list(in_flight))
+    except Exception as e:
+        logger.exception("PDF processing error: %s", e)
+        return {"success": False, "error": f"Could not process PDF: {e}", "extracted_data": {}}
+
+    pages.sort(key=lambda page: page["page"])
+    logger.info("Processed PDF", extra={"pages": len(pages),
+                                        "seconds": round(time.perf_counter() - start, 3)})
+
+    # Merge across pages: full-page text is extracted as one document
+    raw_text = "\n".join(page["raw_text"] for page in pages if page.get("raw_text"))
+    template_fields = {}
+    for page in pages:
+        for field, value in page.get("template_fields", {}).items():
+            template_fields.setdefault(field, value)
+
+    if raw_text:
+        processed_text = preprocess_ocr_text(raw_text)
+        result = build_result(raw_text, processed_text, recognize_entities(processed_text))
+        for field, value in template_fields.items():
+            result["extracted_data"].setdefault(field, value)
+    elif template_fields:
+        result = build_template_result("pdf_pages", template_fields)
+    else:
+        return {
+            "success": False,
+            "error": "Could not extract text from PDF",
+            "extracted_data": {},
+            "pages": [page["timings"] for page in pages]
+        }
+
+    result["page_count"] = len(pages)
+    result["pages"] = [page["timings"] for page in pages]
+    result["processing_time"] = round(time.perf_counter() - start, 3)
+    return result
+
+def process_upload(data):
+    """Decode uploaded bytes in memory and process them; nothing is written to disk"""
+    if is_pdf(data):
+        return record_outcome(process_pdf(data))
+    image = decode_image(data)
+    if image is None:
+        return record_outcome(dict(UNDECODABLE_RESULT))
+    return record_outcome(process_document(image))
+
+def run_upload_job(payload):
+    """Job queue handler: process one uploaded document held in memory"""
+    result = run_upload(payload["data"])
+    extraction_cache.put(payload["cache_key"], result)
+    return result
+
+def init_ocr_process(torch_threads, ready):
+    """OCR pool initializer: pin the thread count and load this worker's own models"""
+    global in_ocr_process, MICRO_BATCH_WINDOW_MS, PDF_PAGE_WORKERS
+    in_ocr_process = True
+    MICRO_BATCH_WINDOW_MS = 0  # each worker runs one document at a time
+    PDF_PAGE_WORKERS = 1  # parallelism comes from the pool, not from page threads
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError) as e:
+        logger.warning("Could not pin torch threads in OCR worker", extra={"error": str(e)})
+    cv2.setNumThreads(1)
+    METRICS.start_journal()
+    load_spacy_model()
+    load_easyocr()
+    with ready.get_lock():
+        ready[0] += nlp is not None
+        ready[1] += reader is not None
+
+def models_loaded():
+    """(spaCy, EasyOCR) availability; with OCR_PROCESSES the models live in the workers"""
+    if OCR_PROCESSES > 0 and not in_ocr_process:
+        ready = ocr_ready
+        if ready is None:
+            return False, False
+        return ready[0] > 0, ready[1] > 0
+    return nlp is not None, reader is not None
+
+def process_upload_in_worker(data):
+    """Runs in an OCR worker; returns the result and the metric updates it made"""
+    check_model_changed()
+    result = process_upload(data)
+    return result, METRICS.take_journal()
+
+def get_ocr_pool():
+    """Start the OCR worker processes on first use"""
+    global ocr_pool, ocr_ready
+    with ocr_pool_lock:
+        if ocr_pool is None:
+            context = multiprocessing.get_context('spawn')  # fork would copy torch/Flask threads
+            ocr_ready = context.Array('i', 2)
+            ocr_pool = ProcessPoolExecutor(
+                max_workers=OCR_PROCESSES,
+                mp_context=context,
+                initializer=init_ocr_process,
+                initargs=(OCR_PROCESS_THREADS, ocr_ready)
+            )
+        return ocr_pool
+
+def submit_upload(data):
+    """Queue one upload on the OCR worker processes"""
+    pool = get_ocr_pool()
+    future = pool.submit(process_upload_in_worker, data)
+    future.pool = pool  # so a crash restarts this pool, not one that already replaced it
+    return future
+
+def collect_upload(future):
+    """Wait for a pooled upload and fold its stage metrics into /metrics"""
+    global ocr_pool, ocr_ready
+    try:
+        result, journal = future.result()
+    except BrokenProcessPool as e:
+        logger.error("OCR worker process died; restarting the pool", extra={"error": str(e)})
+        with ocr_pool_lock:
+            if ocr_pool is future.pool:
+                ocr_pool.shutdown(wait=False, cancel_futures=True)  # reap the surviving workers
+                ocr_pool = None
+                ocr_ready = None
+        return record_outcome({"success": False, "error": "OCR worker crashed", "extracted_data": {}})
+    METRICS.replay(journal)
+    return result
+
+def run_upload(data):
+    """Process an upload on the OCR worker processes when enabled, otherwise in this process"""
+    if OCR_PROCESSES > 0 and not in_ocr_process:
+        return collect_upload(submit_upload(data))
+    return process_upload(data)
+
+job_queue = JobQueue(
+    run_upload_job,
+    workers=OCR_WORKERS,
+    max_queued=JOB_QUEUE_SIZE,
+    result_ttl=JOB_RESULT_TTL
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def observe_request_time(response):
+    start = g.get('request_start')
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint: stage latency histograms, outcome counters, queue/model gauges"""
+    return Response(METRICS.render(), mimetype=Registry.CONTENT_TYPE)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    spacy_loaded, easyocr_loaded = models_loaded()
+    ready = ocr_ready
     return jsonify({
         "status": "healthy",
-        "spacy_available": nlp is not None,
-        "easyocr_available": reader is not None,
+        "spacy_available": spacy_loaded,
+        "easyocr_available": easyocr_loaded,
+        "ocr_processes": OCR_PROCESSES,
+        "ocr_processes_ready": {"spacy": ready[0], "easyocr": ready[1]} if ready is not None else None,
         "model_path": MODEL_PATH,
-        "model_exists": os.path.exists(MODEL_PATH)
+        "model_exists": os.path.exists(MODEL_PATH),
+        "preprocessing": PREPROCESS_CONFIG,
+        "pdf_available": HAS_PDFIUM,
+        "cache": extraction_cache.stats(),
+        "jobs": job_queue.stats()
     })
 
 @app.route('/process', methods=['POST'])
@@ -328,39 +873,214 @@ def process_file():
             }), 400
         
         # EasyOCR will be loaded when needed in extract_text_from_image
-        
-        # Save uploaded file temporarily
+
+        # Repeat uploads of the same scan are served from the cache
+        data = file.read()
+        check_model_changed()
+        cache_key = extraction_cache.hash_bytes(data)
+        cached = extraction_cache.get(cache_key)
+        if cached is not None:
+            return jsonify({**cached, "cached": True})
+
+        # Decode straight from the upload buffer and process the document
+        result = run_upload(data)
+        extraction_cache.put(cache_key, result)
+        return jsonify({**result, "cached": False})
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Server error: {str(e)}"
+        }), 500
+
+@app.route('/process_batch', methods=['POST'])
+def process_batch():
+    """Process many uploaded files in one request; results keep the upload order"""
+    try:
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({
+                "success": False,
+                "error": "No files uploaded"
+            }), 400
+
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({
+                "success": False,
+                "error": f"Too many files in one batch (max {MAX_BATCH_FILES})"
+            }), 400
+
+        start = time.perf_counter()
+        check_model_changed()
+        results = [None] * len(files)
+        pending = []  # (index, cache_key, data) for cache misses
+
+        for index, file in enumerate(files):
+            if file.filename == '' or not allowed_file(file.filename):
+                results[index] = {
+                    "success": False,
+                    "error": "File type not allowed. Please upload PNG, JPG, JPEG, or PDF files.",
+                    "extracted_data": {}
+                }
+                continue
+
+            data = file.read()
+            cache_key = extraction_cache.hash_bytes(data)
+            cached = extraction_cache.get(cache_key)
+            if cached is not None:
+                results[index] = {**cached, "cached": True}
+                continue
+
+            if is_pdf(data) and OCR_PROCESSES <= 0:
+                result = record_outcome(process_pdf(data))
+                extraction_cache.put(cache_key, result)
+                results[index] = {**result, "cached": False}
+                continue
+
+            pending.append((index, cache_key, data))
+
+        # Worker processes take the files concurrently, one document each
+        if OCR_PROCESSES > 0:
+            futures = [(index, cache_key, submit_upload(data)) for index, cache_key, data in pending]
+            for index, cache_key, future in futures:
+                result = collect_upload(future)
+                extraction_cache.put(cache_key, result)
+                results[index] = {**result, "cached": False}
+            pending = []
+
+        # Decode in chunks so only a bounded number of full-size image arrays are alive at once
+        for offset in range(0, len(pending), BATCH_CHUNK_SIZE):
+            chunk = pending[offset:offset + BATCH_CHUNK_SIZE]
+            images = [decode_image(data) for _, _, data in chunk]
+            for (index, cache_key, _), result in zip(chunk, process_documents(images)):
+                record_outcome(result)
+                extraction_cache.put(cache_key, result)
+                results[index] = {**result, "cached": False}
+
+        for file, result in zip(files, results):
+            result["filename"] = file.filename
+
+        elapsed = time.perf_counter() - start
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "processing_time": round(elapsed, 3),
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Server error: {str(e)}"
+        }), 500
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue an uploaded file for background processing and return its job id"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({
+                "success": False,
+                "error": "No file uploaded"
+            }), 400
+
+        file = request.files['file']
+
+        if file.filename == '':
+            return jsonify({
+                "success": False,
+                "error": "No file selected"
+            }), 400
+
+        if not allowed_file(file.filename):
+            return jsonify({
+                "success": False,
+                "error": "File type not allowed. Please upload PNG, JPG, JPEG, or PDF files."
+            }), 400
+
         filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        try:
-            # Process the document
-            result = process_document(file_path)
-            return jsonify(result)
-        finally:
-            # Clean up temporary file
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                
+        data = file.read()
+        check_model_changed()
+        cache_key = extraction_cache.hash_bytes(data)
+        metadata = {"filename": filename}
+
+        cached = extraction_cache.get(cache_key)
+        if cached is not None:
+            job_id = job_queue.complete({**cached, "cached": True}, metadata)
+        else:
+            try:
+                job_id = job_queue.submit(
+                    {"data": data, "filename": filename, "cache_key": cache_key},
+                    metadata
+                )
+            except QueueFullError as e:
+                response = jsonify({
+                    "success": False,
+                    "error": "Server busy, too many documents queued",
+                    "retry_after": e.retry_after
+                })
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 503
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }), 202
+
     except Exception as e:
         return jsonify({
             "success": False,
             "error": f"Server error: {str(e)}"
         }), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job's status; the extraction result is included once it is done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "Unknown or expired job id"
+        }), 404
+
+    response = {
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "filename": job.get("filename"),
+        "submitted_at": job["submitted_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+    if job["status"] == "done":
+        response["result"] = job["result"]
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+    else:
+        response["queue_depth"] = job_queue.depth()
+    return jsonify(response)
+
 if __name__ == '__main__':
-    print("Starting AI Document Processing Service...")
-    print(f"Faker pipeline path: {FAKER_PIPELINE_PATH}")
-    print(f"Model path: {MODEL_PATH}")
-    print(f"Model exists: {os.path.exists(MODEL_PATH)}")
+    logger.info("Starting AI Document Processing Service", extra={
+        "faker_pipeline_path": FAKER_PIPELINE_PATH,
+        "model_path": MODEL_PATH,
+        "model_exists": os.path.exists(MODEL_PATH)
+    })
     
+    if OCR_PROCESSES > 0:
+        # Models live in the worker processes; this process only handles HTTP
+        logger.info("Starting OCR worker processes", extra={
+            "processes": OCR_PROCESSES,
+            "torch_threads": OCR_PROCESS_THREADS
+        })
+        get_ocr_pool().submit(os.getpid)  # spawn the workers now so models load before the first upload
+        logger.info("Starting Flask server on http://localhost:5001")
+        app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
     # Load only spaCy model at startup (EasyOCR loads on demand)
-    if load_spacy_model():
-        print("✓ spaCy model loaded successfully")
-        print("Starting Flask server on http://localhost:5001")
-        print("EasyOCR will be loaded when first document is processed")
+    elif load_spacy_model():
+        logger.info("Starting Flask server on http://localhost:5001; EasyOCR loads with the first document")
         app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
     else:
-        print("✗ Failed to load spaCy model. Exiting.")
+        logger.critical("Failed to load spaCy model. Exiting.")
         exit(1)
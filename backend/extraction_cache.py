@@ -0,0 +1,236 @@
+"""
+Content-addressed cache of document extraction results for ai_service.
+
+Results are keyed by the SHA-256 of the uploaded bytes, kept in an in-memory
+LRU bounded by entry count and approximate size, and optionally mirrored to a
+directory on disk so they survive restarts. Every key is scoped to a
+fingerprint of the spaCy model directory and of the extraction settings
+(preprocessing, template OCR), so retraining or replacing the model, or changing
+those settings, invalidates all previously cached extractions. On disk each
+fingerprint has its own subdirectory; those of other fingerprints are deleted
+when the cache starts and whenever the model changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+FINGERPRINT_DIR = re.compile(r'^([0-9a-f]{16}|no-model(-[0-9a-f]{16})?)$')
+
+
+def fingerprint_model(model_path, settings=None):
+    """Fingerprint a model directory from the names, sizes and mtimes of its files
+
+    ``settings`` (JSON-serializable) is hashed in as well, so results produced
+    under different extraction settings never share a fingerprint.
+    """
+    digest = hashlib.sha256()
+    if settings is not None:
+        digest.update(json.dumps(settings, sort_keys=True).encode() + b"\n")
+    if not model_path or not os.path.exists(model_path):
+        return "no-model" if settings is None else "no-model-" + digest.hexdigest()[:16]
+
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            rel_path = os.path.relpath(path, model_path)
+            digest.update(f"{rel_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class ExtractionCache:
+    """Thread-safe LRU cache of extraction results with optional disk persistence
+
+    ``settings`` are the extraction settings results depend on besides the
+    model; they are part of the fingerprint.
+    """
+
+    def __init__(self, model_path, max_entries=1024, max_bytes=64 * 1024 * 1024,
+                 cache_dir=None, max_disk_bytes=512 * 1024 * 1024, check_interval=5.0, settings=None):
+        self.model_path = model_path
+        self.settings = settings
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._last_check = 0.0
+        self.model_fingerprint = fingerprint_model(model_path, settings)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if self.cache_dir:
+            os.makedirs(self._disk_dir(), exist_ok=True)
+            self._remove_stale_dirs()
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def hash_bytes(data):
+        """Content address of an upload"""
+        return hashlib.sha256(data).hexdigest()
+
+    def check_model(self):
+        """Clear the cache if the model on disk changed; returns True when it did
+
+        The model directory is re-fingerprinted at most every ``check_interval``
+        seconds so lookups stay cheap.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+
+        fingerprint = fingerprint_model(self.model_path, self.settings)
+        with self._lock:
+            if fingerprint == self.model_fingerprint:
+                return False
+            self.model_fingerprint = fingerprint
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+            if self.cache_dir:
+                os.makedirs(self._disk_dir(), exist_ok=True)
+                self._remove_stale_dirs()
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+        return True
+
+    def get(self, key):
+        """Return a cached result for ``key`` or None, counting the hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        result = self._disk_get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._memory_put(key, result, len(json.dumps(result)))
+        return result
+
+    def put(self, key, result):
+        """Cache a successful extraction result"""
+        if not result or not result.get("success"):
+            return
+        payload = json.dumps(result)
+        with self._lock:
+            self._memory_put(key, result, len(payload))
+        self._disk_put(key, payload)
+
+    def stats(self):
+        """Counters reported on /health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "disk_enabled": bool(self.cache_dir),
+                "disk_bytes": self._disk_bytes,
+                "model_fingerprint": self.model_fingerprint,
+            }
+
+    # --- In-memory LRU (callers hold the lock) ---
+
+    def _memory_put(self, key, result, size):
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    # --- Optional disk tier ---
+
+    def _disk_dir(self):
+        return os.path.join(self.cache_dir, self.model_fingerprint)
+
+    def _disk_path(self, key):
+        return os.path.join(self._disk_dir(), f"{key}.json")
+
+    def _remove_stale_dirs(self):
+        """Delete the subdirectories of other model fingerprints; nothing can hit them again"""
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and entry.name != self.model_fingerprint and FINGERPRINT_DIR.match(entry.name):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _disk_files(self):
+        entries = []
+        for entry in os.scandir(self._disk_dir()):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _disk_get(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # bump recency for disk LRU eviction
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key, payload):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+
+        with self._lock:
+            self._disk_bytes += len(payload)
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            # Evict least recently used files until back under the limit
+            files = sorted(self._disk_files(), key=lambda item: item[2])
+            self._disk_bytes = sum(size for _, size, _ in files)
+            for file_path, size, _ in files:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(file_path)
+                    self._disk_bytes -= size
+                    self.evictions += 1
+                except OSError:
+                    pass
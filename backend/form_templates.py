@@ -0,0 +1,199 @@
+"""
+Layout templates for known FRA claim forms and region-of-interest OCR.
+
+For a recognised template there is no need to run text detection over the whole
+page and then rebuild fields with regexes: every value is written above an
+underline at a known row. The service aligns the scan to the template, finds
+each value's underline in its row band, crops the value boxes and recognises
+all of them (plus the title, to confirm the template) in one batched EasyOCR
+``recognize`` call. The result is field -> value directly.
+"""
+
+import difflib
+
+import cv2
+import numpy as np
+
+
+def _stacked_rows(top, sections, section_gap=40, row_gap=35, after_section=25):
+    """Row tops for a form drawn as titled sections of evenly spaced label rows
+
+    Mirrors the layout loop in Faker/new.py: a section title, then one row per
+    field, then a gap before the next section. ``sections`` holds lists of
+    field names; ``None`` marks a row that is not extracted.
+    """
+    rows = []
+    y = top
+    for fields in sections:
+        y += section_gap
+        for field in fields:
+            if field is not None:
+                rows.append((field, y))
+            y += row_gap
+        y += after_section
+    return rows, y
+
+
+_FRA_2006_ROWS, _FRA_2006_BOTTOM = _stacked_rows(130, [
+    ['claimant_name', 'spouse_name', 'age_gender_aadhaar', 'category'],
+    ['village', 'gram_panchayat', 'tehsil', 'district', 'state'],
+    ['claim_type', 'land_claimed', 'land_use', 'boundary_description', 'geo_coordinates'],
+    ['verified_by_gram_sabha', 'status_of_claim', 'date_of_submission', 'date_of_decision', 'patta_title_no'],
+    ['water_body', 'irrigation_source', 'infrastructure_present', 'pm_kisan', 'mgnrega',
+     'jal_jeevan_mission', 'dajgua_benefit'],
+    [None, None, None, None],  # signatures are not extracted
+])
+
+# Template registry. Coordinates are in reference pixels of the rendered form.
+TEMPLATES = {
+    'fra_claim_2006': {
+        'title': 'FRA CLAIM FORM 2006',
+        'title_box': (60, 30, 700, 78),  # x0, y0, x1, y1
+        # Ink extent of the rendered page, used to align scans to the template
+        # (the bottom is the underline of the last signature row)
+        'content': {'left': 60, 'top': 40, 'bottom': _FRA_2006_BOTTOM - 33},
+        'rows': _FRA_2006_ROWS,
+        'underline_offset': (14, 34),  # band below the row top searched for the underline
+        'underline_length': 300,
+        'value_right': 960,  # page margin; values may run past the printed underline up to it
+        'min_fields': 0.6,  # share of rows that must be located to trust the template
+    },
+}
+
+
+def _ink_mask(gray):
+    """Boolean mask of dark pixels (text and lines)"""
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    return ink
+
+
+def _ink_extent(ink, axis, min_pixels):
+    """First and last index along ``axis`` holding more than ``min_pixels`` of ink"""
+    counts = (ink > 0).sum(axis=axis)
+    indices = np.flatnonzero(counts > min_pixels)
+    if len(indices) == 0:
+        return None
+    return int(indices[0]), int(indices[-1])
+
+
+def align(ink, template):
+    """Estimate scale and offset mapping template coordinates onto the scan
+
+    Assumes the page was already deskewed. Returns ``(scale, dx, dy)`` such that
+    ``scan = template * scale + offset``, or None if the page has no content.
+    """
+    height, width = ink.shape[:2]
+    rows = _ink_extent(ink, axis=1, min_pixels=max(2, width // 500))
+    cols = _ink_extent(ink, axis=0, min_pixels=max(2, height // 500))
+    if rows is None or cols is None:
+        return None
+
+    content = template['content']
+    scale = (rows[1] - rows[0]) / float(content['bottom'] - content['top'])
+    if not 0.2 < scale < 10:
+        return None
+    dx = cols[0] - content['left'] * scale
+    dy = rows[0] - content['top'] * scale
+    return scale, dx, dy
+
+
+def locate_value_boxes(ink, template, transform):
+    """Find each field's value box by locating its underline in the row band
+
+    Every row holds one field, so a box starts at its underline and runs to the
+    template's right page margin (or the underline's end, if that is further):
+    handwritten or long values often overrun the printed line. Returns
+    ``{field: [x_min, x_max, y_min, y_max]}`` for the rows whose underline was
+    found.
+    """
+    scale, dx, dy = transform
+    height, width = ink.shape[:2]
+    value_right = int(round(template['value_right'] * scale + dx))
+    band_top, band_bottom = template['underline_offset']
+    min_run = max(10, int(template['underline_length'] * scale * 0.6))
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (min_run, 1))
+
+    boxes = {}
+    for field, row_top in template['rows']:
+        y0 = int(round(row_top * scale + dy))
+        search_top = max(0, y0 + int(band_top * scale))
+        search_bottom = min(height, y0 + int(band_bottom * scale))
+        if search_bottom - search_top < 2:
+            continue
+
+        # Keep only long horizontal strokes: the value underline
+        band = cv2.morphologyEx(ink[search_top:search_bottom], cv2.MORPH_OPEN, kernel)
+        columns = np.flatnonzero(band.any(axis=0))
+        if len(columns) == 0:
+            continue
+        line_y = search_top + int(np.argmax(band.sum(axis=1)))
+        x_min, x_max = int(columns[0]), int(columns[-1])
+        y_min = max(0, y0 - int(4 * scale))
+        y_max = max(y_min + 1, line_y - 1)
+        boxes[field] = [x_min, min(width, max(x_max, value_right)), y_min, y_max]
+    return boxes
+
+
+def split_combined_fields(fields):
+    """Split the combined 'Age / Gender / Aadhaar No' value into its parts"""
+    combined = fields.pop('age_gender_aadhaar', None)
+    if combined:
+        parts = [part.strip() for part in combined.split('/')]
+        for name, part in zip(('age', 'gender', 'aadhaar_no'), parts):
+            if part:
+                fields[name] = part
+    return fields
+
+
+def recognize_template_fields(reader, gray, template_name='fra_claim_2006', batch_size=8):
+    """Read a known form by recognising only its value regions
+
+    ``gray`` is the normalized (deskewed, grayscale) page. Returns a dict of
+    field -> value, or None when the page does not match the template well
+    enough, in which case the caller should fall back to full-page OCR.
+    """
+    template = TEMPLATES[template_name]
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY)
+
+    ink = _ink_mask(gray)
+    transform = align(ink, template)
+    if transform is None:
+        return None
+
+    boxes = locate_value_boxes(ink, template, transform)
+    if len(boxes) < template['min_fields'] * len(template['rows']):
+        return None
+
+    scale, dx, dy = transform
+    tx0, ty0, tx1, ty1 = template['title_box']
+    title_box = [
+        max(0, int(tx0 * scale + dx)), min(gray.shape[1], int(tx1 * scale + dx)),
+        max(0, int(ty0 * scale + dy)), min(gray.shape[0], int(ty1 * scale + dy)),
+    ]
+    if title_box[1] - title_box[0] < 2 or title_box[3] - title_box[2] < 2:
+        return None
+
+    # One batched recognizer call for the title and every value box
+    all_boxes = [title_box] + list(boxes.values())
+    results = reader.recognize(gray, horizontal_list=all_boxes, free_list=[],
+                               detail=1, batch_size=batch_size, paragraph=False)
+
+    # EasyOCR returns crops sorted by position; map them back by box origin
+    texts = {}
+    for box, text, _confidence in results:
+        texts[(int(box[0][0]), int(box[0][1]))] = text.strip()
+
+    title = texts.get((title_box[0], title_box[2]), '')
+    normalized_title = ''.join(ch for ch in title.upper() if ch.isalnum() or ch == ' ')
+    if difflib.SequenceMatcher(None, normalized_title, template['title']).ratio() < 0.6:
+        return None
+
+    fields = {}
+    for field, (x_min, _x_max, y_min, _y_max) in boxes.items():
+        value = texts.get((x_min, y_min), '')
+        if value:
+            fields[field] = value
+    return split_combined_fields(fields)
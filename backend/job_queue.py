@@ -0,0 +1,157 @@
+"""
+Bounded background job queue for long-running OCR work in ai_service.
+
+A fixed pool of worker threads drains a bounded FIFO queue. When the queue is
+full, ``submit`` raises ``QueueFullError`` carrying a retry hint derived from
+recent job durations, so callers can apply backpressure instead of piling up
+blocked request threads. Finished jobs are kept for ``result_ttl`` seconds so
+clients can poll for them.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Fixed-size worker pool over a bounded queue of jobs"""
+
+    def __init__(self, handler, workers=2, max_queued=32, result_ttl=600):
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._durations = deque(maxlen=50)
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ocr-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload, metadata=None):
+        """Queue ``payload`` for the handler and return the new job id"""
+        self.start()
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            **(metadata or {})
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFullError(self.retry_after())
+        return job_id
+
+    def complete(self, result, metadata=None):
+        """Record an already finished job (e.g. a cache hit) and return its id"""
+        self._prune()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "done",
+                "submitted_at": now,
+                "started_at": now,
+                "finished_at": now,
+                "result": result,
+                "error": None,
+                **(metadata or {})
+            }
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if unknown or expired"""
+        self._prune()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def depth(self):
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait before retrying"""
+        with self._lock:
+            durations = list(self._durations)
+        average = sum(durations) / len(durations) if durations else 5.0
+        backlog = self.depth() / max(self.workers, 1)
+        return max(1, int(round(average * max(backlog, 1))))
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "queue_depth": self.depth(),
+            "jobs": counts
+        }
+
+    def _worker(self):
+        while True:
+            job_id, payload = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job["status"] = "running"
+                    job["started_at"] = time.time()
+            start = time.perf_counter()
+            try:
+                result = self.handler(payload)
+                status, error = "done", None
+            except Exception as e:
+                result, status, error = None, "failed", str(e)
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._durations.append(duration)
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job.update(status=status, result=result, error=error, finished_at=time.time())
+            self._queue.task_done()
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
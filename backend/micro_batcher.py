@@ -0,0 +1,98 @@
+"""
+Cross-request micro-batching for ai_service inference.
+
+Concurrent requests each calling ``reader.readtext`` or ``nlp()`` contend for
+the same cores, and every call pays the per-call overhead alone. A
+``MicroBatcher`` instead collects the items submitted from any thread within a
+short window (or until ``max_batch`` are waiting), runs them through one batched
+handler call on a dispatcher thread, and hands each caller its own result.
+
+A request arriving alone waits at most ``max_wait`` seconds before its batch of
+one is run, so the added latency is bounded. With ``dispatchers`` > 1 several
+batches run at once, so a slow batch (e.g. images whose shapes do not batch and
+run one after another) does not hold up every other request.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+
+class MicroBatcher:
+    """Gather items from concurrent callers into batches for a batched handler
+
+    ``handler`` takes a list of items and returns a list of results in the same
+    order. If it raises, every caller in that batch gets the exception.
+    """
+
+    def __init__(self, handler, max_batch=8, max_wait=0.01, name="batcher", on_batch=None, dispatchers=1):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self.on_batch = on_batch  # called with the size of every batch run
+        self.dispatchers = max(1, dispatchers)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the dispatcher threads (idempotent)"""
+        with self._lock:
+            while len(self._threads) < self.dispatchers:
+                thread = threading.Thread(target=self._dispatch, name=f"{self.name}-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, item, timeout=None):
+        """Run ``item`` in the next batch and return its result (blocks the caller)
+
+        Raises ``concurrent.futures.TimeoutError`` after ``timeout`` seconds; an
+        item still waiting for a dispatcher is then dropped from its batch.
+        """
+        self.start()
+        future = Future()
+        self._queue.put((item, future))
+        try:
+            return future.result(timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise
+
+    def _collect(self):
+        """Block for the first item, then gather more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch(self):
+        while True:
+            # Callers that timed out before their batch started are skipped
+            batch = [(item, future) for item, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            try:
+                results = self.handler(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name} handler returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            if self.on_batch:
+                self.on_batch(len(items))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
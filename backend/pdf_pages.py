@@ -0,0 +1,55 @@
+"""
+Streaming PDF rasterization for ai_service.
+
+EasyOCR cannot read PDFs, so multi-page claim bundles are rendered to images
+one page at a time with pdfium. ``iter_pdf_pages`` is a generator: only the page
+currently being handed out is rasterized, and each page is released as soon as
+its pixels are copied out, so a long bundle is never held in memory as a whole.
+"""
+
+try:
+    import pypdfium2 as pdfium
+    HAS_PDFIUM = True
+except ImportError:
+    HAS_PDFIUM = False
+
+PDF_MAGIC = b'%PDF-'
+
+
+def is_pdf(data):
+    """True if the upload bytes look like a PDF document"""
+    return bool(data) and data[:1024].lstrip().startswith(PDF_MAGIC)
+
+
+def iter_pdf_pages(data, dpi=200, max_page_bytes=None):
+    """Yield ``(page_number, image)`` for each page, rendering one page at a time
+
+    ``image`` is a BGR ``uint8`` array, ready for OpenCV and EasyOCR. Pages whose
+    raster would exceed ``max_page_bytes`` at ``dpi`` are rendered at a lower
+    resolution instead.
+    """
+    if not HAS_PDFIUM:
+        raise RuntimeError("PDF support requires pypdfium2 (pip install pypdfium2)")
+
+    pdf = pdfium.PdfDocument(data)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                width, height = page.get_size()  # in points (1/72 inch)
+                scale = dpi / 72.0
+                if max_page_bytes:
+                    raster_bytes = width * scale * height * scale * 3
+                    if raster_bytes > max_page_bytes:
+                        scale *= (max_page_bytes / raster_bytes) ** 0.5
+                bitmap = page.render(scale=scale)
+                try:
+                    # pdfium renders BGR; copy out before the bitmap buffer is freed
+                    image = bitmap.to_numpy()[:, :, :3].copy()
+                finally:
+                    bitmap.close()
+            finally:
+                page.close()
+            yield index + 1, image
+    finally:
+        pdf.close()
@@ -2,6 +2,11 @@ const axios = require('axios');
 const FormData = require('form-data');
 const fs = require('fs');
 const path = require('path');
+const PythonWorkerPool = require('./pythonWorkerPool');
+
+// Warm process_image_simple.py workers; set PYTHON_WORKERS=0 to spawn one process per file
+const PYTHON_WORKERS = parseInt(process.env.PYTHON_WORKERS || '2', 10);
+let workerPool = null;
 
 class ModelClient {
   // Process file with AI model
@@ -36,6 +41,10 @@ class ModelClient {
       console.log('🔍 Looking for Python script at:', modelPath);
       console.log('🔍 Script exists:', fs.existsSync(modelPath));
 
+      if (PYTHON_WORKERS > 0) {
+        return this.processWithWorkerPool(modelPath, venvPython, filePath);
+      }
+
       // Execute Python script
       const { spawn } = require('child_process');
 
@@ -94,6 +103,34 @@ class ModelClient {
     }
   }
 
+  // Process with a warm process_image_simple.py --serve worker (EasyOCR stays loaded)
+  static async processWithWorkerPool(modelPath, venvPython, filePath) {
+    if (!workerPool) {
+      workerPool = new PythonWorkerPool({
+        pythonExe: fs.existsSync(venvPython) ? venvPython : 'python',
+        scriptPath: modelPath,
+        cwd: path.dirname(modelPath),
+        size: PYTHON_WORKERS
+      });
+    }
+
+    try {
+      const result = await workerPool.process(path.resolve(filePath));
+      return {
+        success: result.success,
+        extracted_data: result.extracted_data || this.getEmptyTemplate(),
+        raw_text: result.raw_text || result.error || ''
+      };
+    } catch (error) {
+      console.error('Python worker error:', error.message);
+      return {
+        success: false,
+        extracted_data: this.getEmptyTemplate(),
+        raw_text: 'Processing failed: ' + error.message
+      };
+    }
+  }
+
   // Process with external API endpoint
   static async processWithAPIEndpoint(filePath) {
     try {
@@ -2,15 +2,24 @@ const { spawn } = require('child_process');
 const fs = require('fs').promises;
 const path = require('path');
 const csv = require('csv-parse/sync');
+const PythonWorkerPool = require('./pythonWorkerPool');
 
 // Add logging
 const DEBUG = true;
 
+// Warm pipeline.py workers; set PIPELINE_WORKERS=0 to spawn one process per image
+const PIPELINE_WORKERS = parseInt(process.env.PIPELINE_WORKERS || '1', 10);
+let workerPool = null;
+
 class PipelineProcessor {
   static async processImage(imagePath) {
     try {
       if (DEBUG) console.log('Processing image:', imagePath);
 
+      if (PIPELINE_WORKERS > 0) {
+        return await this.processWithWorkerPool(imagePath);
+      }
+
       // Copy image to pipeline directory
       const pipelineDir = path.join(__dirname, '../../Faker/pipeline');
       const targetImagePath = path.join(pipelineDir, 'output_new.png');
@@ -154,6 +163,55 @@ class PipelineProcessor {
     }
   }
 
+  // Run pipeline.py --serve workers that keep spaCy and EasyOCR loaded between images.
+  // NER labels are the same keys as the CSV columns, so the result maps the same way.
+  static async processWithWorkerPool(imagePath) {
+    const pipelineDir = path.join(__dirname, '../../Faker/pipeline');
+
+    if (!workerPool) {
+      const venvPython = path.join(pipelineDir, 'venv', 'Scripts', 'python.exe');
+      let pythonExe;
+      try {
+        await fs.access(venvPython);
+        pythonExe = venvPython;
+      } catch {
+        pythonExe = 'python';
+      }
+      workerPool = new PythonWorkerPool({
+        pythonExe,
+        scriptPath: path.join(pipelineDir, 'pipeline.py'),
+        cwd: pipelineDir,
+        size: PIPELINE_WORKERS
+      });
+    }
+
+    try {
+      const result = await workerPool.process(path.resolve(imagePath));
+      const entities = result.extracted_data || {};
+      if (!result.success || Object.keys(entities).length === 0) {
+        return {
+          success: false,
+          error: result.error || 'No data extracted from image',
+          data: null
+        };
+      }
+      console.log('✓ Extracted data from pipeline:', entities.CLAIMANT_NAME || 'Unknown');
+      return {
+        success: true,
+        data: this.mapCsvToDatabase(entities),
+        rawCsv: entities,
+        method: 'pipeline'
+      };
+    } catch (error) {
+      console.error('Pipeline worker error:', error.message);
+      return {
+        success: false,
+        error: 'Pipeline processing failed: ' + error.message,
+        data: null
+      };
+    }
+  }
+
   static mapCsvToDatabase(csvRow) {
     // Helper function to convert DD/MM/YYYY to YYYY-MM-DD
     const convertDate = (dateStr) => {
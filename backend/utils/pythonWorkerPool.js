@@ -0,0 +1,159 @@
+const { spawn } = require('child_process');
+const readline = require('readline');
+
+/**
+ * Pool of persistent Python workers started with `--serve`.
+ *
+ * Each worker loads its models once and then answers JSON-lines requests
+ * (see Faker/pipeline/jsonl_worker.py), so uploads no longer pay the spaCy /
+ * EasyOCR load time. Requests are queued and handed to the first idle worker;
+ * a worker that dies is replaced on the next request.
+ *
+ * A worker that exits (or does not report ready within startupTimeoutMs)
+ * before it is ready counts as a startup failure. Replacements are started
+ * with exponential backoff, and after maxStartupFailures in a row every
+ * queued request is rejected instead of waiting for a worker that cannot
+ * start.
+ */
+class PythonWorkerPool {
+  constructor({
+    pythonExe, scriptPath, cwd, size = 2, requestTimeoutMs = 120000,
+    startupTimeoutMs = 300000, maxStartupFailures = 3, retryBackoffMs = 1000
+  }) {
+    this.pythonExe = pythonExe;
+    this.scriptPath = scriptPath;
+    this.cwd = cwd;
+    this.size = size;
+    this.requestTimeoutMs = requestTimeoutMs;
+    this.startupTimeoutMs = startupTimeoutMs;
+    this.maxStartupFailures = maxStartupFailures;
+    this.retryBackoffMs = retryBackoffMs;
+    this.workers = [];
+    this.queue = [];
+    this.nextId = 1;
+    this.startupFailures = 0; // consecutive workers that died before becoming ready
+    this.retryAt = 0;
+    this.retryTimer = null;
+  }
+
+  // Process one image file; resolves with the worker's JSON result
+  process(imagePath) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ message: { image_path: imagePath }, resolve, reject });
+      this._dispatch();
+    });
+  }
+
+  _startWorker() {
+    const child = spawn(this.pythonExe, [this.scriptPath, '--serve'], { cwd: this.cwd });
+    const worker = { child, ready: false, busy: null, timer: null, dead: false };
+    worker.startupTimer = setTimeout(() => {
+      console.error(`Python worker not ready after ${this.startupTimeoutMs} ms; killing it`);
+      child.kill();
+    }, this.startupTimeoutMs);
+
+    readline.createInterface({ input: child.stdout }).on('line', (line) => {
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        console.error('Python worker sent invalid JSON:', line);
+        return;
+      }
+
+      if (message.ready) {
+        worker.ready = true;
+        clearTimeout(worker.startupTimer);
+        this.startupFailures = 0;
+        console.log(`✓ Python worker ready (pid ${message.pid}): ${this.scriptPath}`);
+      } else if (worker.busy && message.id === worker.busy.id) {
+        const { resolve } = worker.busy;
+        clearTimeout(worker.timer);
+        worker.busy = null;
+        delete message.id;
+        resolve(message);
+      }
+      this._dispatch();
+    });
+
+    child.stderr.on('data', (data) => {
+      console.error('Python worker:', data.toString().trim());
+    });
+
+    const fail = (error) => {
+      if (worker.dead) return; // 'error' and 'exit' can both fire
+      worker.dead = true;
+      this.workers = this.workers.filter((w) => w !== worker);
+      clearTimeout(worker.timer);
+      clearTimeout(worker.startupTimer);
+      if (worker.busy) {
+        worker.busy.reject(error);
+        worker.busy = null;
+      }
+      if (!worker.ready) this._startupFailed(error);
+      this._dispatch();
+    };
+    child.on('error', (err) => fail(new Error('Python worker failed to start: ' + err.message)));
+    child.on('exit', (code) => fail(new Error(`Python worker exited with code ${code}`)));
+
+    this.workers.push(worker);
+    return worker;
+  }
+
+  _startupFailed(error) {
+    this.startupFailures += 1;
+    this.retryAt = Date.now() + this.retryBackoffMs * 2 ** (this.startupFailures - 1);
+    if (this.startupFailures >= this.maxStartupFailures && this.workers.length === 0) {
+      console.error(`Python workers failed to start ${this.startupFailures} times; rejecting queued requests`);
+      const queued = this.queue.splice(0);
+      for (const job of queued) {
+        job.reject(new Error(`Python worker could not start: ${error.message}`));
+      }
+      this.startupFailures = 0; // the next request tries again, after the backoff
+    }
+  }
+
+  _dispatch() {
+    if (this.queue.length === 0) return;
+
+    let worker = this.workers.find((w) => w.ready && !w.busy);
+    if (!worker) {
+      // Workers still loading models will pick the queue up once ready
+      if (this.workers.length < this.size) {
+        const wait = this.retryAt - Date.now();
+        if (wait <= 0) {
+          this._startWorker();
+        } else if (!this.retryTimer) {
+          this.retryTimer = setTimeout(() => {
+            this.retryTimer = null;
+            this._dispatch();
+          }, wait);
+        }
+      }
+      return;
+    }
+
+    const job = this.queue.shift();
+    const id = String(this.nextId++);
+    worker.busy = { id, resolve: job.resolve, reject: job.reject };
+    worker.timer = setTimeout(() => {
+      // A stuck worker is killed; 'exit' rejects the request and frees the slot
+      worker.child.kill();
+    }, this.requestTimeoutMs);
+    worker.child.stdin.write(JSON.stringify({ id, ...job.message }) + '\n');
+
+    if (this.queue.length > 0) this._dispatch();
+  }
+
+  shutdown() {
+    clearTimeout(this.retryTimer);
+    this.retryTimer = null;
+    for (const worker of this.workers) {
+      clearTimeout(worker.startupTimer);
+      worker.child.stdin.end();
+    }
+    this.workers = [];
+  }
+}
+
+module.exports = PythonWorkerPool;
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+End-to-end extraction benchmark with accuracy and throughput regression gates.
+
+Runs a fixed, seeded corpus of generated forms (Faker/generate_forms.py) with
+known ground truth through an extraction path and reports:
+
+- per-stage latency percentiles (preprocess, template_ocr, ocr, ner, regex)
+  and per-document totals
+- documents/second and peak RSS
+- per-field and overall accuracy against the ``.json`` labels, over the
+  fields the target can return (label fields it never produces are listed as
+  ``unsupported_fields`` rather than scored as misses)
+
+Targets:
+    service  backend/ai_service.py process_upload (decode, preprocess, OCR, NER, regex)
+    simple   Faker/pipeline/simple_pipeline.py (EasyOCR + regex rules)
+
+Everything runs offline on CPU: CUDA is hidden, and the EasyOCR/spaCy models
+must already be on disk. The corpus is generated once per (seed, size) under
+``benchmarks/.corpus`` unless ``--corpus`` points at an existing one.
+
+Results are written as JSON. With ``--baseline`` the run exits non-zero when
+docs/s drops more than ``--max-throughput-drop`` or overall accuracy drops more
+than ``--max-accuracy-drop`` below the baseline.
+
+Usage:
+    python benchmarks/bench_extraction.py --docs 50 --seed 7 --output bench.json
+    python benchmarks/bench_extraction.py --docs 50 --seed 7 --baseline bench.json
+"""
+
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU only, before torch is imported
+
+import argparse
+import glob
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+sys.path.insert(0, os.path.join(ROOT, 'Faker', 'pipeline'))
+sys.path.insert(0, os.path.join(ROOT, 'Faker'))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def latency_summary(seconds):
+    ms = [value * 1000 for value in seconds]
+    return {
+        "count": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p90_ms": round(percentile(ms, 90), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(statistics.mean(ms), 2),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def normalize_value(value):
+    return re.sub(r'\s+', ' ', str(value)).strip().casefold()
+
+
+def ensure_corpus(docs, seed):
+    """Generate (once) and return the directory of a seeded benchmark corpus"""
+    corpus_dir = os.path.join(ROOT, 'benchmarks', '.corpus', f"seed{seed}_n{docs}")
+    if len(glob.glob(os.path.join(corpus_dir, '**', '*.json'), recursive=True)) >= docs:
+        return corpus_dir
+
+    import generate_forms
+    print(f"Generating {docs} forms (seed {seed}) into {corpus_dir}")
+    generate_forms.init_worker()
+    generate_forms.generate_range((corpus_dir, seed, 0, docs, 1000))
+    return corpus_dir
+
+
+def load_corpus(corpus_dir, limit):
+    items = []
+    for image_path in sorted(glob.glob(os.path.join(corpus_dir, '**', '*.png'), recursive=True)):
+        label_path = os.path.splitext(image_path)[0] + '.json'
+        if os.path.exists(label_path):
+            with open(label_path, 'r', encoding='utf-8') as f:
+                items.append((image_path, json.load(f)))
+    return items[:limit] if limit else items
+
+
+class ServiceTarget:
+    """backend/ai_service.py: the same path /process takes, minus HTTP and the cache"""
+    name = "service"
+
+    def __init__(self):
+        import ai_service
+        self.service = ai_service
+        self.fields = set(ai_service.FIELD_MAPPING)  # fields /process can return
+        # Documents run one at a time, so the micro-batch window would only add latency
+        ai_service.MICRO_BATCH_WINDOW_MS = 0
+        self.stage_samples = {}
+
+        # Record every stage observation as well as feeding /metrics
+        histogram = ai_service.STAGE_SECONDS
+        observe = histogram.observe
+
+        def record(value, **labels):
+            self.stage_samples.setdefault(labels['stage'], []).append(value)
+            observe(value, **labels)
+
+        histogram.observe = record
+
+        ai_service.load_spacy_model()
+        if not ai_service.load_easyocr():
+            raise RuntimeError("EasyOCR reader could not be loaded (models must be available offline)")
+
+    def extract(self, data):
+        result = self.service.process_upload(data)
+        return result.get("extracted_data", {}) if result.get("success") else {}
+
+
+class SimplePipelineTarget:
+    """Faker/pipeline/simple_pipeline.py: EasyOCR text + CSV regex rules"""
+    name = "simple"
+
+    def __init__(self):
+        import simple_pipeline
+        if not simple_pipeline.HAS_EASYOCR:
+            raise RuntimeError("EasyOCR is not installed")
+        self.pipeline = simple_pipeline
+        self.fields = {field.lower() for field in simple_pipeline.CSV_FIELD_RULES.fields}
+        self.stage_samples = {"ocr": [], "regex": []}
+        simple_pipeline.get_reader()
+
+    def extract(self, data):
+        start = time.perf_counter()
+        text = self.pipeline.get_reader().readtext(data, detail=0)
+        self.stage_samples["ocr"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        fields = self.pipeline.CSV_FIELD_RULES.extract("\n".join(text))
+        self.stage_samples["regex"].append(time.perf_counter() - start)
+        return {key.lower(): value for key, value in fields.items()}
+
+
+TARGETS = {"service": ServiceTarget, "simple": SimplePipelineTarget}
+
+
+def run(target, items, warmup):
+    """Extract every document; returns per-doc seconds, per-field hit counts and unsupported fields
+
+    Only label fields in ``target.fields`` are scored; the others can never be
+    extracted by the target and are reported instead of counted as misses.
+    """
+    with open(items[0][0], 'rb') as f:
+        warm_data = f.read()
+    for _ in range(warmup):
+        target.extract(warm_data)
+    for samples in target.stage_samples.values():
+        samples.clear()
+
+    totals = []
+    field_hits = {}
+    field_counts = {}
+    unsupported = set()
+    for image_path, label in items:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        start = time.perf_counter()
+        extracted = target.extract(data)
+        totals.append(time.perf_counter() - start)
+
+        for field, expected in label.items():
+            if field not in target.fields:
+                unsupported.add(field)
+                continue
+            field_counts[field] = field_counts.get(field, 0) + 1
+            if normalize_value(extracted.get(field, '')) == normalize_value(expected):
+                field_hits[field] = field_hits.get(field, 0) + 1
+    return totals, field_hits, field_counts, sorted(unsupported)
+
+
+def check_regressions(results, baseline, max_throughput_drop, max_accuracy_drop):
+    """Human-readable failures where this run is worse than the baseline"""
+    failures = []
+    old_rate, new_rate = baseline["docs_per_second"], results["docs_per_second"]
+    if old_rate and new_rate < old_rate * (1 - max_throughput_drop):
+        failures.append(f"throughput {new_rate} docs/s is more than {max_throughput_drop:.0%} "
+                        f"below baseline {old_rate} docs/s")
+    old_accuracy, new_accuracy = baseline["accuracy"]["overall"], results["accuracy"]["overall"]
+    if new_accuracy < old_accuracy - max_accuracy_drop:
+        failures.append(f"accuracy {new_accuracy} is more than {max_accuracy_drop} below baseline {old_accuracy}")
+    for field, old_field in baseline["accuracy"]["fields"].items():
+        new_field = results["accuracy"]["fields"].get(field)
+        if new_field is not None and new_field < old_field - max_accuracy_drop:
+            failures.append(f"{field} accuracy {new_field} fell from {old_field}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=sorted(TARGETS), default='service')
+    parser.add_argument('--corpus', help='Existing directory of form images with .json labels')
+    parser.add_argument('--docs', type=int, default=50, help='Corpus size (generated if --corpus is not given)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed runs before measuring')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to gate against')
+    parser.add_argument('--max-throughput-drop', type=float, default=0.10, help='Allowed relative docs/s drop')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.02, help='Allowed absolute accuracy drop')
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus or ensure_corpus(args.docs, args.seed)
+    items = load_corpus(corpus_dir, args.docs)
+    if not items:
+        print(f"No labelled images found in {corpus_dir}")
+        return 1
+
+    target = TARGETS[args.target]()
+    start = time.perf_counter()
+    totals, field_hits, field_counts, unsupported = run(target, items, args.warmup)
+    elapsed = time.perf_counter() - start
+
+    fields = {
+        field: round(field_hits.get(field, 0) / count, 4)
+        for field, count in sorted(field_counts.items())
+    }
+    results = {
+        "target": target.name,
+        "corpus": os.path.relpath(corpus_dir, ROOT),
+        "seed": args.seed,
+        "docs": len(items),
+        "docs_per_second": round(len(items) / elapsed, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "latency": {
+            "total": latency_summary(totals),
+            **{stage: latency_summary(samples)
+               for stage, samples in sorted(target.stage_samples.items()) if samples}
+        },
+        "accuracy": {
+            "overall": round(sum(field_hits.values()) / sum(field_counts.values()), 4) if field_counts else 0.0,
+            "fields": fields,
+            "unsupported_fields": unsupported
+        },
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.max_throughput_drop, args.max_accuracy_drop)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        if failures:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pre-OCR normalization stage of ai_service.
+
+Runs every form image in a directory through EasyOCR twice - once as-is and
+once after image_preprocessing - and reports OCR latency, per-step
+preprocessing cost and how much extraction accuracy is kept. When a
+ground-truth ``<image>.json`` label sits next to an image, accuracy is the
+share of labelled fields the regex extractor recovers; otherwise it is the
+text similarity of the preprocessed OCR output to the full-resolution one.
+
+Usage:
+    python benchmarks/bench_preprocessing.py --images Faker/output --upscale 2.5
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import ai_service  # noqa: E402
+from image_preprocessing import load_config, preprocess_image  # noqa: E402
+
+
+def load_label(image_path):
+    label_path = os.path.splitext(image_path)[0] + '.json'
+    if not os.path.exists(label_path):
+        return None
+    with open(label_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def field_accuracy(text, label):
+    """Share of labelled fields whose value the regex extractor found"""
+    extracted = ai_service.extract_fields_with_regex(ai_service.preprocess_ocr_text(text))
+    if not label:
+        return None
+    hits = sum(
+        1 for field, value in label.items()
+        if str(value).strip().lower() == str(extracted.get(field, '')).strip().lower()
+    )
+    return hits / len(label)
+
+
+def timed_ocr(image):
+    start = time.perf_counter()
+    text = ai_service.extract_text_from_image(image) or ''
+    return text, (time.perf_counter() - start) * 1000
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='Directory of generated form images')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of images to benchmark')
+    parser.add_argument('--upscale', type=float, default=1.0,
+                        help='Upscale inputs first to simulate high-resolution phone captures')
+    parser.add_argument('--output', help='Write the summary as JSON to this path')
+    args = parser.parse_args()
+
+    paths = sorted(
+        path for pattern in ('*.png', '*.jpg', '*.jpeg')
+        for path in glob.glob(os.path.join(args.images, pattern))
+    )[:args.limit]
+    if not paths:
+        print(f"No images found in {args.images}")
+        return 1
+
+    if not ai_service.load_easyocr():
+        print("EasyOCR is not available")
+        return 1
+
+    config = load_config()
+    config["enabled"] = True
+    ai_service.extract_text_from_image(cv2.imread(paths[0]))  # warm up the reader
+
+    baseline_ms, processed_ms, preprocess_ms = [], [], []
+    steps = {}
+    similarities, baseline_accuracy, processed_accuracy = [], [], []
+
+    for path in paths:
+        image = cv2.imread(path)
+        if args.upscale != 1.0:
+            image = cv2.resize(image, None, fx=args.upscale, fy=args.upscale, interpolation=cv2.INTER_CUBIC)
+
+        baseline_text, elapsed = timed_ocr(image)
+        baseline_ms.append(elapsed)
+
+        normalized, info = preprocess_image(image, config)
+        preprocess_ms.append(info["total_ms"])
+        for step, step_ms in info["steps_ms"].items():
+            steps.setdefault(step, []).append(step_ms)
+
+        processed_text, elapsed = timed_ocr(normalized)
+        processed_ms.append(elapsed)
+
+        label = load_label(path)
+        if label:
+            baseline_accuracy.append(field_accuracy(baseline_text, label))
+            processed_accuracy.append(field_accuracy(processed_text, label))
+        similarities.append(difflib.SequenceMatcher(None, baseline_text, processed_text).ratio())
+
+        print(f"{os.path.basename(path)}: {info['input_size']} -> {info['output_size']}, "
+              f"OCR {baseline_ms[-1]:.0f} ms -> {processed_ms[-1] + info['total_ms']:.0f} ms")
+
+    total_processed = [ocr + pre for ocr, pre in zip(processed_ms, preprocess_ms)]
+    summary = {
+        "images": len(paths),
+        "upscale": args.upscale,
+        "config": config,
+        "baseline_ocr_ms": {"p50": percentile(baseline_ms, 50), "p95": percentile(baseline_ms, 95)},
+        "preprocessed_total_ms": {"p50": percentile(total_processed, 50), "p95": percentile(total_processed, 95)},
+        "preprocess_steps_ms_p50": {step: percentile(values, 50) for step, values in steps.items()},
+        "speedup_p50": round(percentile(baseline_ms, 50) / percentile(total_processed, 50), 2),
+        "text_similarity_mean": round(statistics.mean(similarities), 4),
+    }
+    baseline_accuracy = [value for value in baseline_accuracy if value is not None]
+    processed_accuracy = [value for value in processed_accuracy if value is not None]
+    if baseline_accuracy and processed_accuracy:
+        summary["field_accuracy_baseline"] = round(statistics.mean(baseline_accuracy), 4)
+        summary["field_accuracy_preprocessed"] = round(statistics.mean(processed_accuracy), 4)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for OCR text normalization and regex field extraction.
+
+Compares the shared compiled engine in Faker/pipeline/extraction_rules.py with
+the per-call ``re.sub`` / ``re.search`` loops it replaced (reproduced below as
+``legacy_*``) on synthetic OCR output of generated forms. It reports
+documents/second for both and counts documents where the two disagree.
+
+Usage:
+    python benchmarks/bench_text_extraction.py --docs 5000
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Faker', 'pipeline'))
+
+from extraction_rules import FORM_FIELD_RULES, extract_boundaries, normalize_ocr_text  # noqa: E402
+
+
+# --- The implementation this engine replaced (from backend/ai_service.py) ---
+
+def legacy_preprocess_ocr_text(text):
+    if not text:
+        return ""
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r'[ ]{2,}', ' ', text)
+    text = re.sub(r'(Age|Gender|Aadhaar No):\s*\n\s*(\S+)', r'\1: \2', text, flags=re.IGNORECASE)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    merged_lines = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.endswith(':') and i + 1 < len(lines):
+            next_line = lines[i + 1]
+            if not next_line.endswith(':'):
+                line = f"{line} {next_line}"
+                i += 1
+        merged_lines.append(line)
+        i += 1
+    text = ' '.join(merged_lines)
+    corrections = {
+        r'\b0fficer\b': 'Officer', r'\bBorewe11\b': 'Borewell', r'\bJa1\b': 'Jal',
+        r'\bC1aimant\b': 'Claimant', r'\bC1aim\b': 'Claim', r'\bVi11age\b': 'Village',
+        r'\bDistr1ct\b': 'District', r'\bState\b': 'State', r'\bPatt1\b': 'Patta',
+        r'\bAadhaar\b': 'Aadhaar', r'\bTehs1l\b': 'Tehsil', r'\bPanchayat\b': 'Panchayat',
+        r'\bTehsi1\b': 'Tehsil', r'\bIs1and\b': 'Island', r'\bE11is\b': 'Ellis',
+        r'\bB1ake\b': 'Blake', r'\bRache1\b': 'Rachel', r'Lsngcirg': ''
+    }
+    for pattern, repl in corrections.items():
+        text = re.sub(pattern, repl, text)
+    return re.split(r'Claimant Signature', text, flags=re.IGNORECASE)[0]
+
+
+LEGACY_PATTERNS = {
+    'claimant_name': r"(?:Name|Claimant|नाम)[:\s]*([A-Za-z\s]+?)(?:\n|$|Father|Husband)",
+    'spouse_name': r"(?:Father|Husband|पिता|पति)[:\s]*(?:Name|नाम)?[:\s]*([A-Za-z\s]+?)(?:\n|$)",
+    'village': r"(?:Village|गांव|ग्राम)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
+    'gram_panchayat': r"(?:Panchayat|पंचायत|Gram\s*Panchayat)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
+    'tehsil': r"(?:Tehsil|Block|तहसील|ब्लॉक)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
+    'district': r"(?:District|जिला)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
+    'state': r"(?:State|राज्य)[:\s]*([A-Za-z\s]+?)(?:\n|$|,)",
+    'land_claimed': r"(?:Area|Land\s*Area|क्षेत्र)[:\s]*([0-9.]+\s*(?:hectare|acre|हेक्टेयर|एकड़)?)",
+    'patta_title_no': r"(?:Khasra|Patta|खसरा|पट्टा)[:\s]*(?:No|Number|संख्या)?[:\s]*([A-Za-z0-9/\-]+)",
+    'aadhaar_no': r"(?:Aadhaar|Adhar|आधार)[:\s]*(?:No|Number|संख्या)?[:\s]*([0-9\s]+)",
+    'category': r"(?:Category|Caste|श्रेणी|जाति)[:\s]*([A-Za-z0-9\s]+)",
+    'claim_type': r"(?:Claim\s*Type|Type\s*of\s*Claim|दावे का प्रकार)[:\s]*([A-Za-z\s]+)",
+    'land_use': r"(?:Land\s*Use|Use\s*of\s*Land|भूमि का उपयोग)[:\s]*([A-Za-z\s]+)",
+    'annual_income': r"(?:Annual\s*Income|Income|वार्षिक आय)[:\s]*([0-9,]+)",
+    'tax_payer': r"(?:Tax\s*Payer|Taxpayer|करदाता)[:\s]*(Yes|No|हाँ|नहीं)",
+    'status_of_claim': r"(?:Status|Status\s*of\s*Claim|स्थिति)[:\s]*(Approved|Rejected|Pending|मंजूर|अस्वीकृत|लंबित)",
+}
+LEGACY_BOUNDARY = r"(?:North|South|East|West|उत्तर|दक्षिण|पूर्व|पश्चिम)[:\s]*([A-Za-z\s,]+?)(?:\n|$)"
+
+
+def legacy_extract(text):
+    data = {}
+    for field, pattern in LEGACY_PATTERNS.items():
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            data[field] = match.group(1).strip()
+    boundaries = re.findall(LEGACY_BOUNDARY, text, re.IGNORECASE | re.MULTILINE)
+    return data, [value.strip() for value in boundaries][:4]
+
+
+def engine_extract(text):
+    return FORM_FIELD_RULES.extract(text), extract_boundaries(text)
+
+
+# --- Synthetic OCR output ---
+
+FIRST = ['Ramesh', 'Sunita', 'Rachel', 'Anil', 'Kavita', 'Blake', 'Meena', 'Suresh']
+LAST = ['Kumar', 'Devi', 'Ellis', 'Singh', 'Oraon', 'Munda', 'Gond', 'Patel']
+PLACES = ['Shankarpur', 'Nimapada', 'Bastar', 'Puri', 'Agartala', 'Udaipur', 'Koraput', 'Dhalai']
+CONFUSIONS = {'Officer': '0fficer', 'Village': 'Vi11age', 'Claimant': 'C1aimant', 'Tehsil': 'Tehsi1',
+              'District': 'Distr1ct', 'Borewell': 'Borewe11', 'Jal': 'Ja1'}
+
+
+def synthetic_ocr_text(rng):
+    lines = [
+        "FRA CLAIM FORM - 2006",
+        "1. Claimant Details",
+        "Name of Claimant:", f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+        "Father's / Husband's Name:", f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+        "Age / Gender / Aadhaar No:", f"{rng.randint(18, 80)} / {rng.choice(['Male', 'Female'])} / "
+                                      f"{rng.randint(10**11, 10**12 - 1)}",
+        "Category:", rng.choice(['ST', 'OTFD']),
+        "2. Village & Administrative Details",
+        "Village:", rng.choice(PLACES),
+        "Gram Panchayat:", rng.choice(PLACES),
+        "Block / Tehsil:", rng.choice(PLACES),
+        "District:", rng.choice(PLACES),
+        "State:", rng.choice(['Odisha', 'Tripura', 'Telangana']),
+        "3. Land Claim Details",
+        "Claim Type:", rng.choice(['IFR', 'CR', 'CFR']),
+        "Area of Land Claimed:", f"{rng.randint(1, 20)} hectares / acres",
+        "Land Use:", rng.choice(['Agriculture', 'Homestead', 'Mixed']),
+        "Annual Income:", str(rng.randint(10000, 300000)),
+        "Tax Payer:", rng.choice(['Yes', 'No']),
+        "Status of Claim:", rng.choice(['Pending', 'Approved', 'Rejected']),
+        "Patta / Title No.:", f"WW{rng.randint(10000, 99999)}",
+        "Irrigation Source:", rng.choice(['Well', 'Canal', 'Borewell']),
+        "Jal Jeevan Mission:", rng.choice(['Yes', 'No']),
+        "Forest Dept. Officer:", f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+        "Claimant Signature / Thumb:", rng.choice(FIRST),
+    ]
+    text = "\n".join(lines)
+    for word, confused in CONFUSIONS.items():
+        if rng.random() < 0.3:
+            text = text.replace(word, confused)
+    return text
+
+
+def run(label, preprocess, extract, texts):
+    start = time.perf_counter()
+    outputs = [extract(preprocess(text)) for text in texts]
+    elapsed = time.perf_counter() - start
+    return outputs, {"label": label, "seconds": round(elapsed, 4), "docs_per_second": round(len(texts) / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_ocr_text(rng) for _ in range(args.docs)]
+
+    legacy_outputs, legacy = run("legacy", legacy_preprocess_ocr_text, legacy_extract, texts)
+    engine_outputs, engine = run("engine", normalize_ocr_text, engine_extract, texts)
+    mismatches = sum(1 for old, new in zip(legacy_outputs, engine_outputs) if old != new)
+
+    print(json.dumps({
+        "docs": args.docs,
+        "legacy": legacy,
+        "engine": engine,
+        "speedup": round(engine["docs_per_second"] / legacy["docs_per_second"], 2),
+        "mismatched_docs": mismatches
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
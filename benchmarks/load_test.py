@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Load and soak test harness for the ai_service HTTP API.
+
+Replays form images (e.g. generated by Faker/generate_forms.py) against
+``/process`` either closed-loop, with ``--concurrency`` clients each sending
+back-to-back, or open-loop at a Poisson ``--rate`` of requests per second. An
+open-loop run keeps sending even when the server falls behind, which is what
+exposes the saturation point. By default every upload gets unique trailing
+bytes so the extraction cache cannot answer it.
+
+Every ``--interval`` seconds the harness records completed requests,
+throughput, error count, latency percentiles, requests in flight, the
+server's RSS (``process_resident_memory_bytes`` scraped from ``/metrics``) and
+the number of files in ``--watch-dir`` (orphaned temp files, for a server on
+this machine). The time series and an overall summary are written as JSON.
+
+Only the standard library is used.
+
+Usage:
+    python benchmarks/load_test.py --images output/bulk --concurrency 20 --duration 300
+    python benchmarks/load_test.py --images output/bulk --rate 2.5 --requests 10000 --output soak.json
+"""
+
+import argparse
+import glob
+import http.client
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def multipart_body(filename, data):
+    boundary = uuid.uuid4().hex
+    content_type = 'application/pdf' if filename.lower().endswith('.pdf') else 'image/' + \
+        ('png' if filename.lower().endswith('.png') else 'jpeg')
+    body = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class Recorder:
+    """Thread-safe per-interval and overall request statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.dropped = 0
+        self.latencies = []
+        self.errors = {}
+        self._window_latencies = []
+        self._window_errors = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, seconds, error=None):
+        with self._lock:
+            self.in_flight -= 1
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+                self._window_errors += 1
+            else:
+                self.latencies.append(seconds)
+                self._window_latencies.append(seconds)
+
+    def drain_window(self):
+        with self._lock:
+            window, errors = self._window_latencies, self._window_errors
+            self._window_latencies, self._window_errors = [], 0
+            return window, errors, self.in_flight
+
+
+class Client:
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.scheme, self.netloc, self.base_path = parts.scheme, parts.netloc, parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            connection = self._local.connection = cls(self.netloc, timeout=self.timeout)
+        return connection
+
+    def request(self, method, path, body=None, headers=None):
+        connection = self._connection()
+        try:
+            connection.request(method, self.base_path + path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+def send(client, recorder, endpoint, path, data, bust_cache):
+    if bust_cache:
+        data = data + b'\n' + uuid.uuid4().bytes  # decoders ignore trailing bytes; the cache key changes
+    body, content_type = multipart_body(os.path.basename(path), data)
+    start = time.perf_counter()
+    error = None
+    try:
+        status, payload = client.request('POST', endpoint, body, {'Content-Type': content_type})
+        if status != 200:
+            error = f"HTTP {status}"
+        elif not json.loads(payload).get('success'):
+            error = "extraction failed"
+    except Exception as e:
+        error = type(e).__name__
+    recorder.finished(time.perf_counter() - start, error)
+
+
+def server_rss_mb(client):
+    try:
+        status, payload = client.request('GET', '/metrics')
+    except Exception:
+        return None
+    if status != 200:
+        return None
+    match = re.search(r'^process_resident_memory_bytes (\S+)$', payload.decode(), re.MULTILINE)
+    return round(float(match.group(1)) / (1024 * 1024), 1) if match else None
+
+
+def count_files(directory):
+    try:
+        return len(os.listdir(directory))
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5001')
+    parser.add_argument('--endpoint', default='/process')
+    parser.add_argument('--images', required=True, help='Directory of form images to upload (searched recursively)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--concurrency', type=int, default=4, help='Closed-loop clients')
+    mode.add_argument('--rate', type=float, help='Open-loop arrival rate (requests/second)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run (unless --requests is reached)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='Open-loop cap on outstanding requests')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds per time-series sample')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Per-request timeout')
+    parser.add_argument('--no-bust-cache', dest='bust_cache', action='store_false',
+                        help='Send identical bytes for repeated images (measures cache hits)')
+    parser.add_argument('--watch-dir', default=tempfile.gettempdir(),
+                        help='Directory whose file count is sampled (orphaned temp files)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report JSON here')
+    args = parser.parse_args()
+
+    paths = sorted(
+        path for pattern in ('*.png', '*.jpg', '*.jpeg', '*.pdf')
+        for path in glob.glob(os.path.join(args.images, '**', pattern), recursive=True)
+    )
+    if not paths:
+        print(f"No images found in {args.images}")
+        return 1
+    # Keep a bounded working set in memory
+    rng = random.Random(args.seed)
+    rng.shuffle(paths)
+    uploads = []
+    for path in paths[:500]:
+        with open(path, 'rb') as f:
+            uploads.append((path, f.read()))
+
+    client = Client(args.url, args.timeout)
+    recorder = Recorder()
+    stop = threading.Event()
+    sent = [0]
+    sent_lock = threading.Lock()
+
+    def next_upload():
+        with sent_lock:
+            if args.requests and sent[0] >= args.requests:
+                return None
+            sent[0] += 1
+            return uploads[sent[0] % len(uploads)]
+
+    def closed_loop_client():
+        while not stop.is_set():
+            upload = next_upload()
+            if upload is None:
+                return
+            recorder.started()
+            send(client, recorder, args.endpoint, *upload, args.bust_cache)
+
+    def open_loop(pool):
+        next_time = time.perf_counter()
+        while not stop.is_set():
+            next_time += rng.expovariate(args.rate)
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+            if recorder.in_flight >= args.max_in_flight:
+                recorder.dropped += 1  # server is saturated past the cap; drop this arrival
+                continue
+            upload = next_upload()
+            if upload is None:
+                return
+            recorder.started()  # counted from arrival, including time queued here
+            pool.submit(send, client, recorder, args.endpoint, *upload, args.bust_cache)
+
+    monitor = Client(args.url, 10)
+    timeline = []
+    start = time.perf_counter()
+    workers = args.max_in_flight if args.rate else args.concurrency
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if args.rate:
+            threading.Thread(target=open_loop, args=(pool,), daemon=True).start()
+        else:
+            for _ in range(args.concurrency):
+                pool.submit(closed_loop_client)
+
+        def all_sent():
+            return bool(args.requests) and sent[0] >= args.requests and recorder.in_flight == 0
+
+        while time.perf_counter() - start < args.duration and not all_sent():
+            stop.wait(args.interval)
+            window, errors, in_flight = recorder.drain_window()
+            sample = {
+                "t": round(time.perf_counter() - start, 1),
+                "completed": len(window),
+                "errors": errors,
+                "throughput_rps": round(len(window) / args.interval, 3),
+                "in_flight": in_flight,
+                "server_rss_mb": server_rss_mb(monitor),
+                "watch_dir_files": count_files(args.watch_dir),
+            }
+            if window:
+                sample["p50_ms"] = round(percentile(window, 50) * 1000, 1)
+                sample["p95_ms"] = round(percentile(window, 95) * 1000, 1)
+                sample["p99_ms"] = round(percentile(window, 99) * 1000, 1)
+            timeline.append(sample)
+            print(json.dumps(sample))
+        stop.set()
+    elapsed = time.perf_counter() - start
+
+    latencies = recorder.latencies
+    total = len(latencies) + sum(recorder.errors.values())
+    rss = [s["server_rss_mb"] for s in timeline if s["server_rss_mb"] is not None]
+    files = [s["watch_dir_files"] for s in timeline if s["watch_dir_files"] is not None]
+    summary = {
+        "mode": f"rate={args.rate}/s" if args.rate else f"concurrency={args.concurrency}",
+        "requests": total,
+        "succeeded": len(latencies),
+        "error_rate": round(sum(recorder.errors.values()) / total, 4) if total else 0.0,
+        "errors": recorder.errors,
+        "dropped_arrivals": recorder.dropped,
+        "seconds": round(elapsed, 1),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+    }
+    if latencies:
+        summary.update({
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(max(latencies) * 1000, 1),
+        })
+    if rss:
+        summary["server_rss_mb"] = {"first": rss[0], "last": rss[-1], "max": max(rss),
+                                    "growth": round(rss[-1] - rss[0], 1)}
+    if files:
+        summary["watch_dir_files"] = {"first": files[0], "last": files[-1], "growth": files[-1] - files[0]}
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "timeline": timeline, "args": vars(args)}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())